@@ -22,6 +22,12 @@ MAX_TOKENS = 4000
 TEMPERATURE = 0.3
 DEFAULT_PROCESSING_MODE = "text"  # 可选：'text', 'vl'
 DEFAULT_BATCH_SIZE = 3  # VL模式下的默认批处理页数
+TEXT_BATCH_SIZE = int(os.getenv("TEXT_BATCH_SIZE", "8"))  # 文本模式下每次请求分析的幻灯片数
+VL_CONCURRENCY = int(os.getenv("VL_CONCURRENCY", "4"))  # VL模式下同时发送的批次请求数
+VL_MAX_RETRIES = int(os.getenv("VL_MAX_RETRIES", "3"))  # VL请求遇到限流(429)、服务端错误(5xx)或连接错误时的最大重试次数
+VL_ENCODE_CACHE_SIZE = int(os.getenv("VL_ENCODE_CACHE_SIZE", "512"))  # VL模式下内存中缓存的已编码图像数量
+CONTENT_CACHE_MAX_ENTRIES = int(os.getenv("CONTENT_CACHE_MAX_ENTRIES", "2000"))  # 每个按内容键缓存的子目录最多保留的条目数
+CONTENT_CACHE_MAX_AGE_DAYS = float(os.getenv("CONTENT_CACHE_MAX_AGE_DAYS", "30"))  # 按内容键缓存的条目的最长保留天数
 
 # 图像转换设置
 IMAGE_DPI = int(os.getenv("IMAGE_DPI", "300"))
@@ -1,10 +1,69 @@
+import re
 from typing import Dict, List, Any, Optional
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 import config
-from templates.page_prompt import SLIDE_ANALYSIS_TEMPLATE
+from templates.page_prompt import SLIDE_ANALYSIS_TEMPLATE, SLIDE_BATCH_ANALYSIS_TEMPLATE
 from utils.cache_manager import CacheManager
 
+# 批量分析响应中每张幻灯片分析结果的起始标记，支持以下几种写法：
+# "### 幻灯片 1: 标题"、"**幻灯片 1**"、"**幻灯片 1：标题**"、"幻灯片 1：标题"
+# 非标题行只有在编号后紧跟冒号、加粗结束或行尾时才视为起始标记，避免误匹配正文中提到的其他幻灯片
+_SLIDE_SECTION_RE = re.compile(
+    r'^[ \t]*(?:#{1,6}[ \t]*(?:\*\*)?[ \t]*幻灯片[ \t]*(\d+)'
+    r'|(?:\*\*)?[ \t]*幻灯片[ \t]*(\d+)[ \t]*(?:\*\*)?[ \t]*(?:[:：]|$))',
+    re.MULTILINE
+)
+
+
+def _format_slide_batch(slides: List[Dict[str, Any]]) -> str:
+    """
+    将一批幻灯片格式化为带编号分节的文本，用于一次批量分析请求
+    
+    Args:
+        slides: 幻灯片数据列表
+        
+    Returns:
+        str: 格式化后的幻灯片内容，每张幻灯片以"### 幻灯片 编号: 标题"开头
+    """
+    sections = []
+    
+    for slide in slides:
+        slide_index = slide["index"] + 1
+        slide_title = slide["title"] or f"幻灯片 {slide_index}"
+        slide_content = "\n".join(slide.get("content", []))
+        
+        # 检查是否有图片，若有则添加图片信息
+        if slide.get("images"):
+            slide_content = f"{slide_content}\n[该幻灯片包含 {len(slide['images'])} 张图片]"
+        
+        sections.append(f"### 幻灯片 {slide_index}: {slide_title}\n{slide_content}")
+    
+    return "\n\n".join(sections)
+
+
+def _parse_slide_batch(response: str, slide_indexes: List[int]) -> List[Optional[str]]:
+    """
+    从批量分析响应中按编号拆分出各张幻灯片的分析结果
+    
+    Args:
+        response: 批量分析的响应文本
+        slide_indexes: 该批次幻灯片的编号列表（从1开始）
+        
+    Returns:
+        List[Optional[str]]: 与slide_indexes一一对应的分析结果，响应中找不到的幻灯片为None
+    """
+    matches = list(_SLIDE_SECTION_RE.finditer(response))
+    sections = {}
+    
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+        # 同一编号出现多次时保留第一次出现的内容
+        sections.setdefault(int(match.group(1) or match.group(2)), response[match.start():end].strip())
+    
+    return [sections.get(idx) for idx in slide_indexes]
+
+
 class ContentAnalyzer:
     """
     内容分析器类，负责使用LLM理解PPT内容
@@ -34,6 +93,13 @@ class ContentAnalyzer:
         # 使用管道方式替代LLMChain
         self.slide_chain = self.slide_template | self.llm
         
+        # 创建批量幻灯片理解模板，一次请求分析多张幻灯片
+        self.batch_template = PromptTemplate(
+            input_variables=["slide_count", "slides_content"],
+            template=SLIDE_BATCH_ANALYSIS_TEMPLATE
+        )
+        self.batch_chain = self.batch_template | self.llm
+        
         # 初始化缓存管理器
         self.cache_manager = CacheManager()
     
@@ -65,8 +131,10 @@ class ContentAnalyzer:
             "slide_content": slide_content
         })
         
-        # 根据新API，结果可能直接是消息内容或包含content字段
-        if isinstance(result, dict) and "content" in result:
+        # 根据新API，结果可能是消息对象、直接是消息内容或包含content字段
+        if hasattr(result, "content"):
+            analysis_text = result.content
+        elif isinstance(result, dict) and "content" in result:
             analysis_text = result["content"]
         elif isinstance(result, dict) and "text" in result:
             analysis_text = result["text"]
@@ -78,6 +146,37 @@ class ContentAnalyzer:
         
         return slide_data
     
+    def analyze_slides_batch(self, slides_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        在一次LLM请求中分析多个幻灯片内容
+        
+        Args:
+            slides_data: 同一批次的幻灯片数据列表
+            
+        Returns:
+            List[Dict]: 包含分析结果的幻灯片数据列表
+        """
+        # 单页批次直接使用单页模板
+        if len(slides_data) == 1:
+            return [self.analyze_slide(slides_data[0])]
+        
+        result = self.batch_chain.invoke({
+            "slide_count": len(slides_data),
+            "slides_content": _format_slide_batch(slides_data)
+        })
+        response = result.content if hasattr(result, "content") else str(result)
+        
+        analyses = _parse_slide_batch(response, [slide["index"] + 1 for slide in slides_data])
+        for slide_data, analysis_text in zip(slides_data, analyses):
+            if analysis_text is None:
+                # 响应中找不到该幻灯片的分析结果时，单独重新分析，避免缓存无效的结果
+                print(f"批量分析结果中未找到第 {slide_data['index'] + 1} 页，单独重新分析...")
+                self.analyze_slide(slide_data)
+            else:
+                slide_data["analysis"] = analysis_text
+        
+        return slides_data
+    
     def analyze_presentation(self, slides_data: List[Dict[str, Any]], input_file: str = None) -> List[Dict[str, Any]]:
         """
         分析整个PPT演示文稿
@@ -123,48 +222,31 @@ class ContentAnalyzer:
                     analyzed_slides.append(slide_data)
                     print(f"已从缓存加载第 {slide_data['index'] + 1} 页分析结果")
         
-        # 分析尚未缓存的幻灯片
-        for slide_data in slides_data:
-            # 跳过已有分析结果的幻灯片
-            if "analysis" in slide_data:
-                continue
+        # 分析尚未缓存的幻灯片，按批次合并为一次请求
+        pending_slides = [slide_data for slide_data in slides_data if "analysis" not in slide_data]
+        batch_size = max(1, config.TEXT_BATCH_SIZE)
+        
+        # 已缓存的分析结果，按索引合并新结果，避免每批次重新读取缓存
+        merged_data = {item["index"]: item for item in existing_data}
+        
+        for start in range(0, len(pending_slides), batch_size):
+            batch = pending_slides[start:start + batch_size]
+            first_index = batch[0]["index"] + 1
+            last_index = batch[-1]["index"] + 1
             
-            print(f"正在分析第 {slide_data['index'] + 1} 页（标题：{slide_data['title'] or '无标题'}）...")
-            analyzed_slide = self.analyze_slide(slide_data)
-            analyzed_slides.append(analyzed_slide)
-            print(f"完成第 {slide_data['index'] + 1} 页分析")
+            print(f"正在分析第 {first_index}-{last_index} 页（共 {len(batch)} 页）...")
+            analyzed_slides.extend(self.analyze_slides_batch(batch))
+            print(f"完成第 {first_index}-{last_index} 页分析")
             
-            # 每分析一个幻灯片就更新缓存
+            # 每分析一个批次就更新缓存
             if input_file:
-                # 准备当前分析的幻灯片数据
-                current_slide_data = {"index": slide_data["index"], "analysis": slide_data["analysis"]}
-                
-                # 检查是否已有之前保存的数据
-                if self.cache_manager.has_cache(input_file, cache_key, self.model_name):
-                    existing_data = self.cache_manager.load_cache(input_file, cache_key, self.model_name)
-                else:
-                    existing_data = []
-                
-                # 合并已有数据和新数据
-                merged_data = list(existing_data)  # 复制现有数据
-                
-                # 更新或添加新分析的幻灯片
-                found = False
-                for i, existing_slide in enumerate(merged_data):
-                    if existing_slide["index"] == current_slide_data["index"]:
-                        merged_data[i] = current_slide_data  # 更新现有项
-                        found = True
-                        break
-                
-                if not found:
-                    merged_data.append(current_slide_data)  # 添加新项
-                
-                # 按幻灯片索引排序
-                merged_data.sort(key=lambda x: x["index"])
+                for slide_data in batch:
+                    merged_data[slide_data["index"]] = {"index": slide_data["index"], "analysis": slide_data["analysis"]}
                 
-                # 保存合并后的数据
-                self.cache_manager.save_cache(input_file, cache_key, self.model_name, merged_data)
-                print(f"已缓存当前分析进度：共 {len(merged_data)} 页")
+                # 按幻灯片索引排序后保存
+                cache_data = [merged_data[index] for index in sorted(merged_data)]
+                self.cache_manager.save_cache(input_file, cache_key, self.model_name, cache_data)
+                print(f"已缓存当前分析进度：共 {len(cache_data)} 页")
         
         # 确保按索引排序
         analyzed_slides.sort(key=lambda x: x["index"])
@@ -1,6 +1,7 @@
 import os
 import sys
 import argparse
+import logging
 from typing import Dict, List, Any
 import config
 from ppt_parser import PPTParser
@@ -535,6 +536,15 @@ def main():
     parser = setup_arg_parser()
     args = parser.parse_args()
     
+    # 只输出本项目模块的日志，格式与print输出保持一致，第三方库的日志级别保持默认
+    # 日志与print输出一样写到标准输出，重定向输出时不会丢失进度信息
+    log_handler = logging.StreamHandler(sys.stdout)
+    log_handler.setFormatter(logging.Formatter("%(message)s"))
+    vl_logger = logging.getLogger("vl_analyzer")
+    vl_logger.addHandler(log_handler)
+    vl_logger.setLevel(logging.INFO)
+    vl_logger.propagate = False
+    
     # 检查文件是否存在且格式支持
     if not os.path.exists(args.input_file):
         print(f"错误: 输入文件不存在: {args.input_file}")
@@ -552,7 +562,7 @@ def main():
         if os.path.exists(args.input_file):
             # 清除特定文件的缓存
             cleared = cache_manager.clear_cache(file_path=args.input_file)
-            print(f"已清除 {args.input_file} 的 {cleared} 条缓存记录")
+            print(f"已清除 {args.input_file} 的 {cleared} 条缓存记录（包括该文件使用过的按内容缓存的API响应）")
         else:
             # 清除所有缓存
             cleared = cache_manager.clear_cache()
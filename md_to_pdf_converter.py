@@ -58,6 +58,27 @@ class MarkdownToPdfConverter:
         print(f"无法将Markdown转换为PDF: {md_file_path}")
         return None
     
+    def _markdown_to_html(self, md_content: str) -> str:
+        """
+        将Markdown文本渲染为HTML，优先使用C实现的cmarkgfm，未安装时回退到markdown库
+        
+        Args:
+            md_content: Markdown文本
+            
+        Returns:
+            str: 渲染后的HTML
+        """
+        try:
+            import cmarkgfm
+            from cmarkgfm.cmark import Options as cmarkgfmOptions
+        except ImportError:
+            import markdown
+            return markdown.markdown(md_content, extensions=['tables', 'fenced_code', 'nl2br'])
+        
+        # HARDBREAKS对应nl2br扩展，UNSAFE保留笔记中的原始HTML（与markdown库行为一致）
+        options = cmarkgfmOptions.CMARK_OPT_HARDBREAKS | cmarkgfmOptions.CMARK_OPT_UNSAFE
+        return cmarkgfm.github_flavored_markdown_to_html(md_content, options=options)
+    
     def _check_and_install_missing_dependencies(self):
         """
         检查并尝试安装缺少的依赖
@@ -215,9 +236,8 @@ class MarkdownToPdfConverter:
             with tempfile.NamedTemporaryFile(suffix=".html", delete=False, encoding='utf-8', mode='w+') as tmp_html:
                 tmp_html_path = tmp_html.name
             
-            # 尝试使用markdown库转换为HTML
+            # 尝试将Markdown渲染为HTML
             try:
-                import markdown
                 with open(md_file_path, 'r', encoding='utf-8') as md_file:
                     md_content = md_file.read()
                     
@@ -254,7 +274,7 @@ class MarkdownToPdfConverter:
                     </style>
                 </head>
                 <body>
-                    {markdown.markdown(md_content, extensions=['tables', 'fenced_code', 'nl2br'])}
+                    {self._markdown_to_html(md_content)}
                 </body>
                 </html>
                 """
@@ -3,10 +3,10 @@ from typing import Dict, List, Any, Optional
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 import config
-import markdown
 import re
 from templates.summary_prompt import SUMMARY_TEMPLATE
 from utils.cache_manager import CacheManager
+from utils.helpers import write_text_atomic
 
 class NoteGenerator:
     """
@@ -157,9 +157,8 @@ class NoteGenerator:
             # 确保输出目录存在
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
-            # 写入文件
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(markdown_text)
+            # 原子写入文件
+            write_text_atomic(output_path, markdown_text)
             
             print(f"笔记已成功保存到: {output_path}")
             return True
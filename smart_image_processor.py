@@ -6,13 +6,15 @@
 import os
 import json
 import re
-from typing import Dict, List, Any, Tuple
+import hashlib
+from typing import Dict, List, Any, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 from PIL import Image
 import base64
 import io
 import config
-from utils.helpers import ensure_directory_exists
+from utils.helpers import write_text_atomic
 
 class SmartImageProcessor:
     """
@@ -28,6 +30,16 @@ class SmartImageProcessor:
         self.model_name = model_name or config.VL_MODEL
         self.api_key = config.VL_API_KEY
         self.api_base = config.VL_API_BASE
+        
+        # 持久的HTTP会话，复用连接，避免每张图片重新建立TCP/TLS连接
+        self._http = requests.Session()
+        self._http.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        })
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        self._http.mount("http://", adapter)
+        self._http.mount("https://", adapter)
     
     def process_notes_with_images(self, notes_file: str, pages_data: List[Dict[str, Any]]) -> str:
         """
@@ -53,6 +65,9 @@ class SmartImageProcessor:
         # 需要插入的图片列表，格式为[(位置索引, 标题, Markdown图片)]
         images_to_insert = []
         
+        # 已评估图片的结果，按图片内容摘要索引，相同图片只调用一次VL API
+        evaluated_images = {}
+        
         # 评估并处理每个页面的图片
         for page in pages_data:
             page_index = page.get("index", 0)
@@ -85,8 +100,14 @@ class SmartImageProcessor:
                         print(f"警告: 找不到图片 {rel_path}")
                         continue
                 
-                # 评估图片是否与内容相关
-                relevance, description = self._evaluate_image_relevance(img_path, page_content, page_title)
+                # 评估图片是否与内容相关（相同内容的图片复用首次评估结果）
+                digest = self._image_digest(img_path)
+                if digest in evaluated_images:
+                    relevance, description = evaluated_images[digest]
+                    print(f"图片 {img_index+1} 与已评估图片相同，复用评估结果")
+                else:
+                    relevance, description = self._evaluate_image_relevance(img_path, page_content, page_title)
+                    evaluated_images[digest] = (relevance, description)
                 
                 # 如果图片相关，加入待插入列表
                 if relevance >= 0.6:  # 相关性阈值
@@ -128,9 +149,8 @@ class SmartImageProcessor:
             # 重新组合笔记内容
             new_content = '\n'.join(lines)
             
-            # 写回文件
-            with open(notes_file, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            # 原子写回文件
+            write_text_atomic(notes_file, new_content)
             
             print(f"智能图片处理完成，共插入 {insertion_count} 张相关图片")
             return new_content
@@ -203,56 +223,76 @@ class SmartImageProcessor:
         
         return 0  # 文件开头
     
-    def _resize_image_if_needed(self, img_path: str) -> str:
+    def _image_digest(self, img_path: str) -> str:
         """
-        如果图片尺寸超过最大限制，调整图片大小以减少token消耗
+        计算图片文件内容的摘要，用于识别重复图片
         
         Args:
             img_path: 图片路径
             
         Returns:
-            str: 调整大小后的图片路径（如果有调整）或原始路径
+            str: 图片内容的BLAKE2b摘要
+        """
+        with open(img_path, "rb") as image_file:
+            return hashlib.blake2b(image_file.read(), digest_size=16).hexdigest()
+    
+    def _resize_image_if_needed(self, img: Image.Image) -> Optional[Image.Image]:
+        """
+        如果图片尺寸超过最大限制，调整图片大小以减少token消耗
+        
+        Args:
+            img: 已打开的图片，需要调整时会被原地缩小
+            
+        Returns:
+            Optional[Image.Image]: 调整大小后的RGB图片，无需调整或调整失败时返回None
         """
         try:
             # 最大图像尺寸
             max_width = 1200  # 宽度最大限制
             max_height = 1200  # 高度最大限制
             
-            # 打开图片
-            with Image.open(img_path) as img:
-                width, height = img.size
+            width, height = img.size
+            
+            # 检查是否需要调整大小
+            if width > max_width or height > max_height:
+                # thumbnail保持宽高比原地缩放，reducing_gap先做快速的整数倍缩小再进行LANCZOS重采样
+                img.thumbnail((max_width, max_height), Image.LANCZOS, reducing_gap=2.0)
                 
-                # 检查是否需要调整大小
-                if width > max_width or height > max_height:
-                    # 计算调整比例
-                    ratio = min(max_width / width, max_height / height)
-                    new_width = int(width * ratio)
-                    new_height = int(height * ratio)
-                    
-                    print(f"调整图片大小: {width}x{height} -> {new_width}x{new_height}")
-                    
-                    # 调整图像大小
-                    resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-                    
-                    # 创建临时文件路径
-                    temp_dir = os.path.join(os.path.dirname(img_path), "temp")
-                    ensure_directory_exists(temp_dir)
-                    filename = os.path.basename(img_path)
-                    resized_path = os.path.join(temp_dir, f"resized_{filename}")
-                    
-                    # 保存调整后的图片，优化质量
-                    resized_img.save(resized_path, optimize=True, quality=90)
-                    
-                    print(f"图片已调整至 {new_width}x{new_height}")
-                    return resized_path
-                    
-                # 不需要调整大小
-                return img_path
+                print(f"调整图片大小: {width}x{height} -> {img.width}x{img.height}")
+                
+                # JPEG编码要求RGB模式
+                return img if img.mode == "RGB" else img.convert("RGB")
+                
+            # 不需要调整大小
+            return None
                     
         except Exception as e:
             print(f"调整图片大小时出错: {e}")
         
-        return img_path
+        return None
+    
+    def _encode_image(self, img_path: str) -> str:
+        """
+        读取图片，在内存中按需调整大小后编码为base64，不产生临时文件
+        
+        Args:
+            img_path: 图片路径
+            
+        Returns:
+            str: base64编码的图片字符串
+        """
+        with Image.open(img_path) as img:
+            resized_img = self._resize_image_if_needed(img)
+            
+            # 尺寸未超出限制，直接编码原始文件内容
+            if resized_img is None:
+                with open(img_path, "rb") as image_file:
+                    return base64.b64encode(image_file.read()).decode("ascii")
+            
+            buffer = io.BytesIO()
+            resized_img.save(buffer, format="JPEG", quality=90)
+            with buffer.getbuffer() as data:
+                return base64.b64encode(data).decode("ascii")
     
     def _evaluate_image_relevance(self, img_path: str, page_content: str, page_title: str) -> Tuple[float, str]:
         """
@@ -267,19 +307,8 @@ class SmartImageProcessor:
             Tuple[float, str]: (相关性分数, 图片描述)
         """
         try:
-            # 调整图片大小（如果需要）
-            sized_img_path = self._resize_image_if_needed(img_path)
-            
-            # 编码图片
-            with open(sized_img_path, "rb") as image_file:
-                encoded_image = base64.b64encode(image_file.read()).decode('utf-8')
-            
-            # 如果使用了临时调整大小的图片，并且与原始路径不同，删除临时文件
-            if sized_img_path != img_path:
-                try:
-                    os.remove(sized_img_path)
-                except:
-                    pass
+            # 调整图片大小（如果需要）并编码
+            encoded_image = self._encode_image(img_path)
             
             # 准备提示词
             prompt = f"""
@@ -357,16 +386,11 @@ class SmartImageProcessor:
                 "temperature": 0.3
             }
             
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
-            
             # 发送请求
-            response = requests.post(
+            response = self._http.post(
                 f"{self.api_base}/chat/completions",
-                headers=headers,
-                json=payload
+                json=payload,
+                timeout=120
             )
             
             # 解析响应
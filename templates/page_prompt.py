@@ -19,4 +19,20 @@ SLIDE_ANALYSIS_TEMPLATE = """
 5. 与前面内容的联系: [该内容如何与之前的概念关联]
 
 请确保你的分析全面、准确，并特别注意捕捉学术或技术性内容。
-""" 
\ No newline at end of file
+""" 
+# 多张幻灯片批量分析模板
+SLIDE_BATCH_ANALYSIS_TEMPLATE = """
+你是一位专业的教育内容分析师。请依次分析以下 {slide_count} 张PPT幻灯片的内容，并分别提取每张幻灯片中的关键信息、主要概念和重点。
+
+{slides_content}
+
+请按幻灯片顺序依次分析，每张幻灯片的分析结果必须以单独一行的 "### 幻灯片 编号" 开头（编号与上文保持一致），并提供以下格式的分析:
+
+1. 主要概念: [简洁列出该页面的主要概念]
+2. 关键点: [以要点形式列出重要信息]
+3. 定义/公式: [列出该页面包含的所有定义或公式]
+4. 例子/案例: [列出该页面的例子或案例]
+5. 与前面内容的联系: [该内容如何与之前的概念关联]
+
+请确保你的分析全面、准确，并特别注意捕捉学术或技术性内容。不要合并或跳过任何一张幻灯片。
+"""
@@ -57,9 +57,9 @@ SUMMARY_WITH_IMAGES_TEMPLATE = """
 8. 对于重要但PPT中没有详细说明的概念，添加必要的补充知识。所有补充内容应以"补充："开头，确保这些内容与PPT主题相关且有助于理解。
 
 9. 在适当位置引用原始文档中的图片，使用以下占位符格式:
-   {{{image: page_X_img_Y 图片描述}}}
+   {{{{{{image: page_X_img_Y 图片描述}}}}}}
    
-   例如: {{{image: page1_img2 课程结构图}}} 表示引用第1页的第2张图片，并添加"课程结构图"的描述
+   例如: {{{{{{image: page1_img2 课程结构图}}}}}} 表示引用第1页的第2张图片，并添加"课程结构图"的描述
 
 10. 在引用图片时:
    - 仅引用对理解内容有帮助的重要图片
@@ -92,9 +92,9 @@ SUMMARY_WITH_FULL_PAGES_TEMPLATE = """
 8. 对于重要但PPT中没有详细说明的概念，添加必要的补充知识。所有补充内容应以"补充："开头，确保这些内容与PPT主题相关且有助于理解。
 
 9. 在每个主要章节或小节的开始，引用对应页面的完整图片，使用以下占位符格式:
-   {{{fullpage: page_X 描述内容}}}
+   {{{{{{fullpage: page_X 描述内容}}}}}}
    
-   例如: {{{fullpage: page1 第一章概述}}} 表示引用第1页的完整图片，并添加"第一章概述"的描述
+   例如: {{{{{{fullpage: page1 第一章概述}}}}}} 表示引用第1页的完整图片，并添加"第一章概述"的描述
 
 10. 在引用完整页面图片时:
    - 在每个主要章节或重要内容的开始处添加
@@ -127,14 +127,14 @@ SUMMARY_WITH_ALL_IMAGES_TEMPLATE = """
 8. 对于重要但PPT中没有详细说明的概念，添加必要的补充知识。所有补充内容应以"补充："开头，确保这些内容与PPT主题相关且有助于理解。
 
 9. 在每个主要章节或小节的开始，引用对应页面的完整图片，使用以下占位符格式:
-   {{{fullpage: page_X 描述内容}}}
+   {{{{{{fullpage: page_X 描述内容}}}}}}
    
-   例如: {{{fullpage: page1 第一章概述}}} 表示引用第1页的完整图片
+   例如: {{{{{{fullpage: page1 第一章概述}}}}}} 表示引用第1页的完整图片
 
 10. 在适当位置引用原始文档中的单个图片，使用以下占位符格式:
-   {{{image: page_X_img_Y 图片描述}}}
+   {{{{{{image: page_X_img_Y 图片描述}}}}}}
    
-   例如: {{{image: page1_img2 课程结构图}}} 表示引用单个图片
+   例如: {{{{{{image: page1_img2 课程结构图}}}}}} 表示引用单个图片
 
 11. 图片引用策略:
     - 在每个主要章节开始处添加完整页面图片
@@ -2,11 +2,10 @@
 视觉语言模型（VL-LLM）的提示模板
 """
 
-# 单页分析模板
-VL_SINGLE_PAGE_TEMPLATE = """
-你是一位专业的教育内容分析师。请分析这张幻灯片/文档图像，并提取其中的关键信息、主要概念和重点。
-
-图像为文档的第 {page_index} 页，标题可能是: {page_title}
+# 单页分析的固定指令，作为系统消息发送
+# 其中不包含任何随页面变化的内容，保证每次请求的前缀完全相同，便于服务端复用提示词前缀缓存
+VL_SINGLE_PAGE_INSTRUCTIONS = """
+你是一位专业的教育内容分析师。请分析用户提供的幻灯片/文档图像，并提取其中的关键信息、主要概念和重点。
 
 请关注图像中的文本内容、布局结构、图表、重点标记（如高亮、加粗）等元素。
 
@@ -22,19 +21,22 @@ VL_SINGLE_PAGE_TEMPLATE = """
 请确保你的分析全面、准确，并特别注意捕捉学术或技术性内容。如果页面中的部分文本不清晰，请说明。在知识补充部分，填写与主题直接相关的内容，这些内容将被用于在笔记中标注"补充："。
 """
 
-# 批量页面分析模板
-VL_BATCH_PAGES_TEMPLATE = """
-你是一位专业的教育内容分析师。请依次分析以下 {page_count} 张幻灯片/文档图像，并提取其中的关键信息、主要概念和重点。
+# 单页分析模板，仅包含当前页面的信息
+VL_SINGLE_PAGE_TEMPLATE = """
+图像为文档的第 {page_index} 页，标题可能是: {page_title}
+"""
 
-这些图像是一个文档的连续页面，按顺序排列为：
+# 批量页面分析的固定指令，作为系统消息发送
+VL_BATCH_PAGES_INSTRUCTIONS = """
+你是一位专业的教育内容分析师。请依次分析用户提供的多张幻灯片/文档图像，并提取其中的关键信息、主要概念和重点。
 
-{pages_info}
+这些图像是一个文档的连续页面，用户会按顺序给出每个页面的页码和标题。
 
 请依次分析每个页面中的文本内容、布局结构、图表、重点标记（如高亮、加粗）等元素。特别注意页面之间的连续性和概念的发展。
 
 对于每个页面，请提供以下格式的分析:
 
-## 页面 {page_indexes_placeholder}：{page_titles_placeholder}
+## 页面 [页码]：[页面标题]
 
 1. 主要概念: [简洁列出该页面的主要概念]
 2. 关键点: [以要点形式列出重要信息]
@@ -47,6 +49,13 @@ VL_BATCH_PAGES_TEMPLATE = """
 请确保你的分析全面、准确，并特别注意捕捉学术或技术性内容。如果页面中的部分文本不清晰，请说明。在知识补充部分，填写与主题直接相关的内容，这些内容将被用于在笔记中标注"补充："。
 """
 
+# 批量页面分析模板，仅包含本批次页面的信息
+VL_BATCH_PAGES_TEMPLATE = """
+请依次分析以下 {page_count} 张图像，按顺序排列为：
+
+{pages_info}
+"""
+
 # 内容总结模板
 VL_SUMMARY_TEMPLATE = """
 你是一位专业的教育内容分析师。请根据对整个文档所有页面的分析，提供一个整体的内容摘要。
@@ -1,10 +1,85 @@
 import os
 import json
 import hashlib
+import mmap
+import tempfile
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import config
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 旧版本使用的MD5缓存键长度（十六进制字符数）
+LEGACY_KEY_LENGTH = 32
+
+# 超过该大小的缓存文件通过mmap读取，避免复制整个文件内容
+MMAP_THRESHOLD = 64 * 1024
+
+# 缓存索引文件名，记录每个缓存键对应的文件路径、模式和模型
+INDEX_FILENAME = "_index.json"
+
+# 输入文件指纹文件名，记录每个输入文件的(大小, 修改时间, 内容摘要)
+FINGERPRINTS_FILENAME = "_fingerprints.json"
+
+# 缓存目录中不属于缓存条目的元数据文件
+METADATA_FILENAMES = frozenset({INDEX_FILENAME, FINGERPRINTS_FILENAME})
+
+# 计算文件内容摘要时每次读取的字节数
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def _dumps(obj: Any) -> bytes:
+    """
+    将对象序列化为UTF-8编码的JSON字节串，优先使用orjson
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data: bytes) -> Any:
+    """
+    解析JSON字节串，优先使用orjson
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_file(path: str) -> Any:
+    """
+    读取并解析JSON文件，较大的文件通过mmap直接交给orjson解析
+    """
+    with open(path, 'rb') as f:
+        if orjson is None or os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return _loads(f.read())
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def _write_file(path: str, payload: bytes) -> None:
+    """
+    原子地写入文件：先写入临时文件再重命名，避免中途出错留下不完整的文件
+    """
+    # 每次写入使用唯一的临时文件名，多个线程或进程同时写入同一文件时互不干扰
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or os.curdir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # 写入或重命名失败时删除临时文件
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
 
 class CacheManager:
     """
@@ -20,26 +95,164 @@ class CacheManager:
         self.cache_dir = cache_dir or os.path.join(config.DEFAULT_OUTPUT_DIR, "cache")
         # 确保缓存目录存在
         os.makedirs(self.cache_dir, exist_ok=True)
+        
+        # 缓存键的内存缓存：(文件路径, 模式, 模型) -> ((文件大小, 修改时间), 缓存键)
+        self._key_cache: Dict[Tuple[str, str, str], Tuple[Tuple[int, float], str]] = {}
+        
+        # 缓存索引，首次使用时加载
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        
+        # 输入文件指纹：文件路径 -> [文件大小, 修改时间, 内容摘要]，首次使用时加载
+        self._fingerprints: Optional[Dict[str, List[Any]]] = None
+        
+        # 已创建的按内容键索引的缓存子目录
+        self._namespaces = set()
+        
+        # 记录旧版本（MD5缓存键）生成的缓存文件，使其仍可被读取
+        with os.scandir(self.cache_dir) as entries:
+            self._legacy_files = {
+                entry.name for entry in entries
+                if entry.name.endswith('.json') and len(entry.name) == LEGACY_KEY_LENGTH + len('.json')
+            }
     
-    def generate_cache_key(self, file_path: str, mode: str, model: str) -> str:
+    def generate_cache_key(self, file_path: str, mode: str, model: str,
+                           file_stat: Optional[os.stat_result] = None) -> str:
         """
-        根据文件路径和处理模式生成缓存键
+        根据文件路径、文件内容和处理模式生成缓存键
         
         Args:
             file_path: 输入文件路径
             mode: 处理模式 (text 或 vl)
             model: 使用的模型名称
+            file_stat: 已获取的文件状态，为None时读取文件获取
             
         Returns:
             str: 缓存键
         """
-        # 获取文件修改时间，确保文件变化时缓存失效
-        file_mtime = os.path.getmtime(file_path)
+        file_stat = file_stat or os.stat(file_path)
+        
+        # 使用文件内容摘要而不是修改时间，仅修改时间变化而内容未变时缓存仍然有效
+        digest = self._file_digest(file_path, file_stat)
+        
+        # 使用文件路径、文件大小、内容摘要、模式和模型名称生成唯一标识
+        cache_id = f"{file_path}|{file_stat.st_size}|{digest}|{mode}|{model}"
+        return hashlib.blake2b(cache_id.encode(), digest_size=8).hexdigest()
+    
+    def _file_digest(self, file_path: str, file_stat: os.stat_result) -> str:
+        """
+        获取文件内容摘要，文件大小和修改时间与记录一致时直接使用记录的摘要，否则重新计算
+        
+        Args:
+            file_path: 输入文件路径
+            file_stat: 文件状态
+            
+        Returns:
+            str: 文件内容的BLAKE2b摘要
+        """
+        fingerprints = self._get_fingerprints()
+        
+        stored = fingerprints.get(file_path)
+        if stored and stored[0] == file_stat.st_size and stored[1] == file_stat.st_mtime:
+            return stored[2]
+        
+        # 分块读取文件计算摘要，复用同一个缓冲区
+        hasher = hashlib.blake2b(digest_size=16)
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(file_path, 'rb', buffering=0) as f:
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                hasher.update(view[:size])
+        digest = hasher.hexdigest()
         
-        # 使用文件路径、修改时间、模式和模型名称生成唯一标识
+        fingerprints[file_path] = [file_stat.st_size, file_stat.st_mtime, digest]
+        try:
+            _write_file(os.path.join(self.cache_dir, FINGERPRINTS_FILENAME), _dumps(fingerprints))
+        except OSError as e:
+            print(f"保存文件指纹失败: {e}")
+        
+        return digest
+    
+    def _get_fingerprints(self) -> Dict[str, List[Any]]:
+        """
+        获取输入文件指纹记录，首次调用时从磁盘加载，文件缺失或损坏时从空记录开始
+        
+        Returns:
+            Dict[str, List[Any]]: 文件路径到[文件大小, 修改时间, 内容摘要]的映射
+        """
+        if self._fingerprints is None:
+            try:
+                fingerprints = _load_file(os.path.join(self.cache_dir, FINGERPRINTS_FILENAME))
+                self._fingerprints = fingerprints if isinstance(fingerprints, dict) else {}
+            except FileNotFoundError:
+                self._fingerprints = {}
+            except Exception as e:
+                print(f"加载文件指纹失败，将重新计算: {e}")
+                self._fingerprints = {}
+        
+        return self._fingerprints
+    
+    def _key(self, file_path: str, mode: str, model: str) -> str:
+        """
+        获取缓存键，文件大小和修改时间未变化时直接复用上次计算的结果
+        
+        Args:
+            file_path: 输入文件路径
+            mode: 处理模式
+            model: 使用的模型名称
+            
+        Returns:
+            str: 缓存键
+        """
+        file_stat = os.stat(file_path)
+        stat_key = (file_stat.st_size, file_stat.st_mtime)
+        cached = self._key_cache.get((file_path, mode, model))
+        if cached and cached[0] == stat_key:
+            return cached[1]
+        
+        cache_key = self.generate_cache_key(file_path, mode, model, file_stat=file_stat)
+        self._key_cache[(file_path, mode, model)] = (stat_key, cache_key)
+        return cache_key
+    
+    def _legacy_cache_key(self, file_path: str, mode: str, model: str) -> str:
+        """
+        生成旧版本的MD5缓存键，用于兼容已有的缓存文件
+        
+        Args:
+            file_path: 输入文件路径
+            mode: 处理模式
+            model: 使用的模型名称
+            
+        Returns:
+            str: 旧版本缓存键
+        """
+        file_mtime = os.path.getmtime(file_path)
         cache_id = f"{file_path}|{file_mtime}|{mode}|{model}"
         return hashlib.md5(cache_id.encode()).hexdigest()
     
+    def _resolve_cache_path(self, file_path: str, mode: str, model: str) -> str:
+        """
+        获取已有缓存的文件路径，新缓存不存在时回退到旧版本的缓存文件
+        
+        Args:
+            file_path: 输入文件路径
+            mode: 处理模式
+            model: 使用的模型名称
+            
+        Returns:
+            str: 缓存文件路径
+        """
+        cache_path = self.get_cache_path(self._key(file_path, mode, model))
+        
+        if self._legacy_files and not os.path.exists(cache_path):
+            legacy_key = self._legacy_cache_key(file_path, mode, model)
+            if f"{legacy_key}.json" in self._legacy_files:
+                return self.get_cache_path(legacy_key)
+        
+        return cache_path
+    
     def get_cache_path(self, cache_key: str) -> str:
         """
         获取缓存文件路径
@@ -52,6 +265,100 @@ class CacheManager:
         """
         return os.path.join(self.cache_dir, f"{cache_key}.json")
     
+    def _get_index(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取缓存索引，首次调用时从磁盘加载，索引缺失或损坏时重建
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: 缓存键到缓存元数据的映射
+        """
+        if self._index is not None:
+            return self._index
+        
+        index = self._read_index_file()
+        if index is not None:
+            self._index = index
+            return self._index
+        
+        self._index = self._rebuild_index()
+        self._write_index()
+        return self._index
+    
+    def _read_index_file(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        从磁盘读取缓存索引的最新内容
+        
+        Returns:
+            Optional[Dict[str, Dict[str, Any]]]: 缓存索引，文件不存在或损坏时返回None
+        """
+        try:
+            index = _load_file(os.path.join(self.cache_dir, INDEX_FILENAME))
+            if isinstance(index, dict):
+                return index
+            print("缓存索引格式无效，正在重建...")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"加载缓存索引失败，正在重建: {e}")
+        return None
+    
+    def _update_index(self, updates: Dict[str, Dict[str, Any]], removals: Optional[List[str]] = None) -> None:
+        """
+        将本实例的修改合并到磁盘上最新的缓存索引后写回
+        
+        同一运行中的多个CacheManager实例以及并发运行的进程共用缓存目录，
+        写入前重新读取索引，避免用过时的内存副本覆盖其他实例写入的条目
+        
+        Args:
+            updates: 要添加或更新的索引项
+            removals: 要删除的缓存键
+        """
+        index = self._read_index_file()
+        if index is None:
+            index = self._get_index()
+        
+        index.update(updates)
+        for cache_key in removals or ():
+            index.pop(cache_key, None)
+        
+        self._index = index
+        self._write_index()
+    
+    def _rebuild_index(self) -> Dict[str, Dict[str, Any]]:
+        """
+        遍历缓存目录中的所有缓存文件，重建缓存索引
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: 缓存键到缓存元数据的映射
+        """
+        index = {}
+        
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json') or entry.name in METADATA_FILENAMES:
+                    continue
+                
+                try:
+                    cache_data = _load_file(entry.path)
+                    
+                    index[entry.name[:-len('.json')]] = {
+                        'file_path': cache_data['file_path'],
+                        'mode': cache_data['mode'],
+                        'model': cache_data['model'],
+                        'timestamp': cache_data.get('timestamp')
+                    }
+                except Exception:
+                    # 如果读取失败，跳过该文件
+                    continue
+        
+        return index
+    
+    def _write_index(self) -> None:
+        """
+        将缓存索引写入磁盘，先写临时文件再重命名，保证索引文件完整
+        """
+        _write_file(os.path.join(self.cache_dir, INDEX_FILENAME), _dumps(self._index or {}))
+    
     def has_cache(self, file_path: str, mode: str, model: str) -> bool:
         """
         检查是否存在对应的缓存
@@ -64,13 +371,13 @@ class CacheManager:
         Returns:
             bool: 是否存在缓存
         """
-        if not os.path.exists(file_path):
+        try:
+            cache_path = self._resolve_cache_path(file_path, mode, model)
+            # 空文件视为损坏的缓存
+            return os.stat(cache_path).st_size > 0
+        except FileNotFoundError:
+            # 输入文件或缓存文件不存在
             return False
-            
-        cache_key = self.generate_cache_key(file_path, mode, model)
-        cache_path = self.get_cache_path(cache_key)
-        
-        return os.path.exists(cache_path)
     
     def save_cache(self, file_path: str, mode: str, model: str, data: Any) -> bool:
         """
@@ -86,17 +393,42 @@ class CacheManager:
             bool: 是否成功保存
         """
         try:
-            cache_key = self.generate_cache_key(file_path, mode, model)
+            cache_key = self._key(file_path, mode, model)
             cache_path = self.get_cache_path(cache_key)
+            timestamp = time.time()
             
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'file_path': file_path,
-                    'mode': mode,
-                    'model': model,
-                    'timestamp': time.time(),
-                    'data': data
-                }, f, ensure_ascii=False, indent=2)
+            payload = _dumps({
+                'file_path': file_path,
+                'mode': mode,
+                'model': model,
+                'timestamp': timestamp,
+                'data': data
+            })
+            
+            # 一次性写入完整的序列化结果，写完后再替换原缓存文件
+            _write_file(cache_path, payload)
+            
+            updates = {cache_key: {
+                'file_path': file_path,
+                'mode': mode,
+                'model': model,
+                'timestamp': timestamp
+            }}
+            removals = []
+            
+            # 新缓存已写入，删除同一条目对应的旧版本缓存文件
+            if self._legacy_files:
+                legacy_key = self._legacy_cache_key(file_path, mode, model)
+                if f"{legacy_key}.json" in self._legacy_files:
+                    self._legacy_files.discard(f"{legacy_key}.json")
+                    removals.append(legacy_key)
+                    try:
+                        os.remove(self.get_cache_path(legacy_key))
+                    except FileNotFoundError:
+                        # 旧版本缓存文件已被其他进程删除
+                        pass
+            
+            self._update_index(updates, removals)
             
             return True
         except Exception as e:
@@ -115,25 +447,172 @@ class CacheManager:
         Returns:
             Optional[Any]: 缓存的数据，如果不存在则返回None
         """
-        if not self.has_cache(file_path, mode, model):
+        try:
+            cache_path = self._resolve_cache_path(file_path, mode, model)
+            
+            cache_data = _load_file(cache_path)
+            
+            return cache_data['data']
+        except FileNotFoundError:
+            # 输入文件或缓存文件不存在
             return None
+        except Exception as e:
+            print(f"加载缓存失败: {e}")
+            return None
+    
+    def get_key_cache_path(self, namespace: str, key: str) -> str:
+        """
+        获取按内容键索引的缓存文件路径
+        
+        Args:
+            namespace: 缓存子目录名称
+            key: 缓存键
+            
+        Returns:
+            str: 缓存文件路径
+        """
+        return os.path.join(self.cache_dir, namespace, f"{key}.json")
+    
+    def load_cache_by_key(self, namespace: str, key: str, file_path: str = None) -> Optional[Any]:
+        """
+        按内容键加载缓存数据，同一条目可被多个输入文件共用
         
+        Args:
+            namespace: 缓存子目录名称
+            key: 缓存键
+            file_path: 使用该条目的输入文件路径，记录到条目的来源中，按文件清除缓存时据此查找
+            
+        Returns:
+            Optional[Any]: 缓存的数据，如果不存在或已过期则返回None
+        """
+        cache_path = self.get_key_cache_path(namespace, key)
         try:
-            cache_key = self.generate_cache_key(file_path, mode, model)
-            cache_path = self.get_cache_path(cache_key)
+            entry = _load_file(cache_path)
+            if time.time() - entry['timestamp'] > config.CONTENT_CACHE_MAX_AGE_DAYS * 86400:
+                os.remove(cache_path)
+                return None
             
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+            # 其他文件产生的条目被当前文件命中时，把当前文件加入来源
+            file_paths = entry.setdefault('file_paths', [])
+            if file_path is not None and file_path not in file_paths:
+                file_paths.append(file_path)
+                _write_file(cache_path, _dumps(entry))
             
-            return cache_data['data']
+            return entry['data']
+        except FileNotFoundError:
+            return None
         except Exception as e:
             print(f"加载缓存失败: {e}")
             return None
     
+    def save_cache_by_key(self, namespace: str, key: str, data: Any, file_path: str = None) -> bool:
+        """
+        按内容键保存缓存数据，同一条目可被多个输入文件共用
+        
+        Args:
+            namespace: 缓存子目录名称
+            key: 缓存键
+            data: 要缓存的数据
+            file_path: 产生该数据的输入文件路径，按文件清除缓存时据此查找
+            
+        Returns:
+            bool: 是否成功保存
+        """
+        try:
+            if namespace not in self._namespaces:
+                os.makedirs(os.path.join(self.cache_dir, namespace), exist_ok=True)
+                self._namespaces.add(namespace)
+                # 每个进程首次写入该子目录时清理过期和超出数量上限的条目
+                self._prune_namespace(namespace)
+            
+            _write_file(self.get_key_cache_path(namespace, key), _dumps({
+                'timestamp': time.time(),
+                'file_paths': [file_path] if file_path is not None else [],
+                'data': data
+            }))
+            return True
+        except Exception as e:
+            print(f"保存缓存失败: {e}")
+            return False
+    
+    def _prune_namespace(self, namespace: str) -> int:
+        """
+        清理按内容键缓存的子目录：删除超过保留天数的条目，并只保留最近写入的若干条
+        
+        Args:
+            namespace: 缓存子目录名称
+            
+        Returns:
+            int: 删除的条目数量
+        """
+        removed = 0
+        try:
+            with os.scandir(os.path.join(self.cache_dir, namespace)) as entries:
+                cache_files = [
+                    (entry.stat().st_mtime, entry.path) for entry in entries
+                    if entry.name.endswith('.json')
+                ]
+            
+            # 按修改时间从新到旧排序，超出数量上限或已过期的条目被删除
+            cache_files.sort(reverse=True)
+            expire_before = time.time() - config.CONTENT_CACHE_MAX_AGE_DAYS * 86400
+            for i, (mtime, path) in enumerate(cache_files):
+                if i >= config.CONTENT_CACHE_MAX_ENTRIES or mtime < expire_before:
+                    try:
+                        os.remove(path)
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+        except Exception as e:
+            print(f"清理缓存失败: {e}")
+        return removed
+    
+    def _clear_namespaces(self, file_path: str = None) -> int:
+        """
+        清除按内容键缓存的子目录中的条目
+        
+        Args:
+            file_path: 只清除来源包含该输入文件的条目，为None则清空所有条目
+            
+        Returns:
+            int: 删除的条目数量
+        """
+        cleared_count = 0
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                with os.scandir(entry.path) as sub_entries:
+                    for sub_entry in sub_entries:
+                        if not sub_entry.name.endswith('.json'):
+                            continue
+                        
+                        if file_path is not None:
+                            try:
+                                file_paths = _load_file(sub_entry.path).get('file_paths')
+                            except FileNotFoundError:
+                                continue
+                            except Exception:
+                                # 无法读取的条目视为无效，一并删除
+                                file_paths = None
+                            # 没有来源记录的旧条目无法判断是否属于该文件，为保证重新请求一并删除
+                            if file_paths and file_path not in file_paths:
+                                continue
+                        
+                        try:
+                            os.unlink(sub_entry.path)
+                            cleared_count += 1
+                        except FileNotFoundError:
+                            pass
+        return cleared_count
+    
     def clear_cache(self, file_path: str = None, mode: str = None, model: str = None) -> int:
         """
         清除缓存
         
+        按文件清除缓存时，也会清除来源包含该文件的按内容键缓存的条目（如API响应），
+        保证重新处理该文件时重新请求API，其他文件的条目不受影响
+        
         Args:
             file_path: 输入文件路径，为None则忽略
             mode: 处理模式，为None则忽略
@@ -145,43 +624,77 @@ class CacheManager:
         cleared_count = 0
         
         try:
-            # 如果所有参数都为None，则清除所有缓存
+            # 如果所有参数都为None，则清除所有缓存并清空索引
             if file_path is None and mode is None and model is None:
-                for filename in os.listdir(self.cache_dir):
-                    if filename.endswith('.json'):
-                        os.remove(os.path.join(self.cache_dir, filename))
-                        cleared_count += 1
+                with os.scandir(self.cache_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.json') and entry.name not in METADATA_FILENAMES:
+                            os.unlink(entry.path)
+                            cleared_count += 1
+                
+                # 按内容键索引的缓存子目录
+                cleared_count += self._clear_namespaces()
+                
+                self._index = {}
+                self._legacy_files.clear()
+                self._write_index()
                 return cleared_count
             
-            # 否则，遍历缓存文件，检查匹配条件
-            for filename in os.listdir(self.cache_dir):
-                if filename.endswith('.json'):
-                    cache_path = os.path.join(self.cache_dir, filename)
-                    
+            # 否则，根据磁盘上最新的索引查找满足条件的缓存
+            index = self._read_index_file()
+            if index is None:
+                self._index = None
+                index = self._get_index()
+            
+            candidates = dict(index)
+            
+            # 其他实例或进程并发写入时索引可能遗漏条目，补充检查不在索引中的缓存文件
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.json') or entry.name in METADATA_FILENAMES:
+                        continue
+                    cache_key = entry.name[:-len('.json')]
+                    if cache_key in candidates:
+                        continue
                     try:
-                        with open(cache_path, 'r', encoding='utf-8') as f:
-                            cache_data = json.load(f)
-                        
-                        # 检查是否满足删除条件
-                        should_delete = True
-                        
-                        if file_path is not None and cache_data['file_path'] != file_path:
-                            should_delete = False
-                        
-                        if mode is not None and cache_data['mode'] != mode:
-                            should_delete = False
-                        
-                        if model is not None and cache_data['model'] != model:
-                            should_delete = False
-                        
-                        if should_delete:
-                            os.remove(cache_path)
-                            cleared_count += 1
-                    except:
+                        cache_data = _load_file(entry.path)
+                        candidates[cache_key] = {
+                            'file_path': cache_data['file_path'],
+                            'mode': cache_data['mode'],
+                            'model': cache_data['model']
+                        }
+                    except Exception:
                         # 如果读取失败，跳过该文件
                         continue
             
+            removed_keys = []
+            for cache_key, entry in candidates.items():
+                if file_path is not None and entry['file_path'] != file_path:
+                    continue
+                
+                if mode is not None and entry['mode'] != mode:
+                    continue
+                
+                if model is not None and entry['model'] != model:
+                    continue
+                
+                try:
+                    os.remove(self.get_cache_path(cache_key))
+                    cleared_count += 1
+                except FileNotFoundError:
+                    # 缓存文件已不存在，仅移除索引项
+                    pass
+                
+                removed_keys.append(cache_key)
+                self._legacy_files.discard(f"{cache_key}.json")
+            
+            self._update_index({}, removed_keys)
+            
+            # 按文件清除时，一并清除该文件产生或使用过的按内容键缓存的条目
+            if file_path is not None:
+                cleared_count += self._clear_namespaces(file_path)
+            
             return cleared_count
         except Exception as e:
             print(f"清除缓存失败: {e}")
-            return cleared_count 
\ No newline at end of file
+            return cleared_count
@@ -4,8 +4,18 @@
 
 import os
 import re
+import stat
+import tempfile
 from typing import List, Dict, Any
 
+# 支持的输入文件扩展名
+PPT_EXTENSIONS = frozenset({'.ppt', '.pptx'})
+PDF_EXTENSIONS = frozenset({'.pdf'})
+SUPPORTED_EXTENSIONS = PPT_EXTENSIONS | PDF_EXTENSIONS
+
+# 匹配**之间的加粗内容
+_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+
 def ensure_directory_exists(directory_path: str) -> None:
     """
     确保指定的目录存在，如果不存在则创建
@@ -16,6 +26,57 @@ def ensure_directory_exists(directory_path: str) -> None:
     if not os.path.exists(directory_path):
         os.makedirs(directory_path, exist_ok=True)
 
+def _default_file_mode() -> int:
+    """
+    获取按当前umask创建新文件时的默认权限
+    
+    Returns:
+        int: 文件权限位
+    """
+    # os.umask只能通过设置来读取，读取后立即恢复
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+# 新建文件的默认权限，与直接用open创建文件时一致
+_DEFAULT_FILE_MODE = _default_file_mode()
+
+def write_text_atomic(file_path: str, text: str) -> None:
+    """
+    原子地写入文本文件：先写入同目录下的临时文件，再重命名覆盖目标文件，
+    避免写入中途崩溃导致文件内容不完整
+    
+    目标文件已存在时保留其权限，否则使用按umask计算的默认权限
+    （临时文件创建时的权限为0600，需在重命名前修正）
+    
+    Args:
+        file_path: 目标文件路径
+        text: 要写入的文本内容
+    """
+    # 临时文件与目标文件位于同一目录，相对路径无需先解析为绝对路径
+    directory = os.path.dirname(file_path) or os.curdir
+    # 一次性编码为UTF-8后以二进制方式写入，不经过文本层的分块编码和缓冲
+    data = text.encode('utf-8')
+    
+    try:
+        mode = stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        mode = _DEFAULT_FILE_MODE
+    
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        # 写入或重命名失败时删除临时文件
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
 def get_file_extension(file_path: str) -> str:
     """
     获取文件扩展名
@@ -26,8 +87,12 @@ def get_file_extension(file_path: str) -> str:
     Returns:
         str: 文件扩展名（小写）
     """
-    _, ext = os.path.splitext(file_path)
-    return ext.lower()
+    # 只在文件名部分查找扩展名，与os.path.splitext一致地忽略文件名开头的点
+    start = max(file_path.rfind(os.sep), file_path.rfind(os.altsep) if os.altsep else -1) + 1
+    while start < len(file_path) and file_path[start] == '.':
+        start += 1
+    dot = file_path.rfind('.', start)
+    return file_path[dot:].lower() if dot > start else ''
 
 def is_ppt_file(file_path: str) -> bool:
     """
@@ -39,8 +104,7 @@ def is_ppt_file(file_path: str) -> bool:
     Returns:
         bool: 如果是PPT文件返回True
     """
-    ext = get_file_extension(file_path)
-    return ext in ['.ppt', '.pptx']
+    return get_file_extension(file_path) in PPT_EXTENSIONS
 
 def is_pdf_file(file_path: str) -> bool:
     """
@@ -52,8 +116,7 @@ def is_pdf_file(file_path: str) -> bool:
     Returns:
         bool: 如果是PDF文件返回True
     """
-    ext = get_file_extension(file_path)
-    return ext == '.pdf'
+    return get_file_extension(file_path) in PDF_EXTENSIONS
 
 def is_supported_file(file_path: str) -> bool:
     """
@@ -65,7 +128,7 @@ def is_supported_file(file_path: str) -> bool:
     Returns:
         bool: 如果是支持的文件返回True
     """
-    return is_ppt_file(file_path) or is_pdf_file(file_path)
+    return get_file_extension(file_path) in SUPPORTED_EXTENSIONS
 
 def extract_keywords(text: str) -> List[str]:
     """
@@ -78,12 +141,10 @@ def extract_keywords(text: str) -> List[str]:
         List[str]: 提取的关键词列表
     """
     # 简单实现：提取加粗内容作为关键词
-    # 匹配**之间的内容
-    bold_pattern = re.compile(r'\*\*(.*?)\*\*')
-    bold_words = bold_pattern.findall(text)
+    bold_words = _BOLD_RE.findall(text)
     
-    # 去除重复项并返回
-    return list(set(bold_words))
+    # 去除重复项并保持出现顺序
+    return list(dict.fromkeys(bold_words))
 
 def format_slide_reference(slide_data: Dict[str, Any]) -> str:
     """
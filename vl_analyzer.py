@@ -1,20 +1,280 @@
 import os
 import base64
-from typing import Dict, List, Any, Optional
-import requests
+import hashlib
+from typing import Dict, List, Any, Optional, Tuple, TypedDict
+import importlib.util
+import httpx
 import json
+import logging
+import re
+import random
+import string
 from PIL import Image
 import io
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
 import config
-from templates.vl_prompt import VL_SINGLE_PAGE_TEMPLATE, VL_BATCH_PAGES_TEMPLATE, VL_SUMMARY_TEMPLATE
+from templates.vl_prompt import VL_SINGLE_PAGE_INSTRUCTIONS, VL_SINGLE_PAGE_TEMPLATE, VL_BATCH_PAGES_INSTRUCTIONS, VL_BATCH_PAGES_TEMPLATE, VL_SUMMARY_TEMPLATE
 from templates.summary_prompt import SUMMARY_TEMPLATE, SUMMARY_WITH_IMAGES_TEMPLATE, SUMMARY_WITH_FULL_PAGES_TEMPLATE, SUMMARY_WITH_ALL_IMAGES_TEMPLATE
-from utils.helpers import ensure_directory_exists
+from utils.helpers import ensure_directory_exists, write_text_atomic
 from utils.cache_manager import CacheManager
 import openai
 from openai import OpenAI
-import traceback
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 安装了simplejpeg时使用libjpeg-turbo编码缩放后的图像
+try:
+    import numpy as np
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+# 安装了h2时启用HTTP/2，多个并发请求复用同一个连接
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 按请求内容缓存VL API响应的缓存子目录
+API_CACHE_NAMESPACE = "vl_api"
+
+# 需要退避重试的HTTP状态码：限流和服务端暂时不可用
+_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# 重试等待时间上限（秒）
+_MAX_RETRY_DELAY = 60.0
+
+# 页面分析失败或无法从批量响应中提取时填入的结果，这些结果不写入分析进度缓存
+_ANALYSIS_FAILED = "分析失败"
+_ANALYSIS_MISSING = "无法提取该页面的分析结果"
+_FAILED_ANALYSES = frozenset({_ANALYSIS_FAILED, _ANALYSIS_MISSING})
+
+# 按提示词内容缓存文本LLM响应的缓存子目录，仅缓存温度不高于阈值的请求
+LLM_CACHE_NAMESPACE = "llm_completions"
+_LLM_CACHE_MAX_TEMPERATURE = 0.3
+
+# 笔记中的图像占位符，格式为: {{{image: page_x_img_y description}}}
+# 或完整页面图像占位符，格式为: {{{fullpage: page_x description}}}
+_PLACEHOLDER_RE = re.compile(r"\{\{\{(image|fullpage):([^}]*)\}\}\}")
+
+# 请求体中图像URL的占位符，序列化后替换为图像的data URL
+_IMAGE_URL_PLACEHOLDER = "__AUTONOTE_IMAGE_URL__"
+_IMAGE_URL_TOKEN = f'"{_IMAGE_URL_PLACEHOLDER}"'.encode("ascii")
+_IMAGE_URL_PREFIX = b'"data:image/jpeg;base64,'
+
+# 响应中的页面标记：“## 页面 N”、“页面 N”、“**页面 N**”、“页面N”、“第N页”
+_PAGE_MARK_RE = re.compile(r'(##\s*)?(?:\*\*)?页面\s*(\d+)|第\s*(\d+)\s*页')
+
+
+class ImageRef(TypedDict):
+    """
+    笔记中引用的图片
+    """
+    relative_path: str
+    index: int
+    type: str
+    description: str
+
+
+class PageAnalysis(TypedDict):
+    """
+    生成笔记时每个页面的分析数据
+    """
+    title: str
+    content: str
+    images: List[ImageRef]
+    full_page_image: Optional[Dict[str, Any]]
+    index: int
+
+
+def _normalize_images(images: Any) -> List[ImageRef]:
+    """
+    将页面的图片列表规范化为ImageRef列表，缺少relative_path时使用image，没有路径信息的图片被跳过
+    
+    Args:
+        images: 页面数据中的图片列表，可能为None或格式无效
+        
+    Returns:
+        List[ImageRef]: 规范化后的图片列表
+    """
+    if not isinstance(images, list):
+        return []
+    
+    normalized = []
+    for i, img in enumerate(images):
+        if not isinstance(img, dict):
+            continue
+        
+        # 优先使用relative_path，如果不存在则尝试使用image
+        if 'relative_path' in img:
+            relative_path = img['relative_path']
+        elif 'image' in img:
+            relative_path = img['image']
+        else:
+            continue
+        
+        normalized.append({
+            'relative_path': relative_path,
+            'index': img.get('index', i),
+            'type': img.get('type', 'image'),
+            'description': img.get('description', f'图片 {i+1}')
+        })
+    
+    return normalized
+
+
+def _normalize_full_page_image(full_page_image: Any) -> Optional[Dict[str, Any]]:
+    """
+    检查整页图片数据，缺少relative_path时使用image
+    
+    Args:
+        full_page_image: 页面数据中的整页图片
+        
+    Returns:
+        Optional[Dict]: 有效的整页图片数据，无效时返回None
+    """
+    if not isinstance(full_page_image, dict):
+        return None
+    
+    if 'relative_path' not in full_page_image:
+        if 'image' not in full_page_image:
+            return None
+        full_page_image['relative_path'] = full_page_image['image']
+    
+    return full_page_image
+
+
+def _normalize_pages(pages_data: List[Dict[str, Any]]) -> Tuple[List[int], List[int], List[Optional[str]], Dict[int, str]]:
+    """
+    一次性校验页面数据，将图片引用展开为按位置对应的并列列表，供占位符替换时直接构建映射
+    
+    Args:
+        pages_data: 页面数据列表
+        
+    Returns:
+        Tuple: (页面索引列表, 图片索引列表, 相对路径列表, 页面索引到第一个有效完整页面图像相对路径的映射)，
+        前三个列表按位置一一对应，带index字段但缺少relative_path的图片对应的路径为None
+    """
+    page_indices = []
+    img_indices = []
+    rel_paths = []
+    fullpage_paths = {}
+    
+    for page_data in pages_data:
+        page_index = page_data.get("index", 0)
+        
+        images = page_data.get("images")
+        if isinstance(images, list):
+            for i, img in enumerate(images):
+                if not isinstance(img, dict):
+                    continue
+                if "index" in img:
+                    img_index = img["index"]
+                elif "relative_path" in img:
+                    # 如果没有索引但有路径，使用列表索引作为图片索引
+                    img_index = i
+                else:
+                    continue
+                page_indices.append(page_index)
+                img_indices.append(img_index)
+                rel_paths.append(img.get("relative_path"))
+        
+        full_page = page_data.get("full_page_image")
+        if isinstance(full_page, dict) and "relative_path" in full_page:
+            fullpage_paths.setdefault(page_data.get("index"), full_page["relative_path"])
+    
+    return page_indices, img_indices, rel_paths, fullpage_paths
+
+
+@lru_cache(maxsize=1024)
+def _parse_img_id(img_id: str) -> Optional[Tuple[int, int]]:
+    """
+    解析图像占位符中的图片ID，同一ID重复出现时直接使用缓存的结果
+    
+    Args:
+        img_id: 图片ID，格式为page{页码}_img{图片序号}，均从1开始
+        
+    Returns:
+        Optional[Tuple[int, int]]: 从0开始的(页面索引, 图片索引)，格式无效时返回None
+    """
+    if not img_id.startswith("page"):
+        return None
+    
+    # 按固定格式直接定位两段数字，不生成中间字符串列表
+    separator = img_id.find("_img", 4)
+    if separator < 0:
+        return None
+    
+    try:
+        return int(img_id[4:separator]) - 1, int(img_id[separator + 4:]) - 1
+    except ValueError:
+        return None
+
+
+def _dumps_indented(obj: Any) -> str:
+    """
+    将对象序列化为缩进的JSON文本，用于填入提示词，安装了orjson时使用orjson
+    
+    Args:
+        obj: 要序列化的对象
+        
+    Returns:
+        str: 缩进2个空格、保留非ASCII字符的JSON文本
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def _file_digest(file_path: str) -> bytes:
+    """
+    计算文件内容的BLAKE2b摘要，用于识别内容相同的图像
+    
+    Args:
+        file_path: 文件路径
+        
+    Returns:
+        bytes: 8字节的内容摘要
+    """
+    with open(file_path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=8).digest()
+
+
+class _PreparedTemplate:
+    """
+    预先解析的提示词模板，格式化时按顺序拼接字面文本和变量值，
+    与PromptTemplate一样忽略模板中未使用的变量
+    """
+    def __init__(self, template: str):
+        """
+        解析模板，拆分出字面文本和变量名
+        
+        Args:
+            template: 使用{变量名}占位的模板字符串
+        """
+        self._parts = []
+        for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+            if format_spec or conversion:
+                raise ValueError(f"模板变量不支持格式说明: {field_name}")
+            self._parts.append((literal, field_name))
+    
+    def format(self, **kwargs: Any) -> str:
+        """
+        使用给定的变量值填充模板
+        
+        Returns:
+            str: 填充后的提示词
+        """
+        return "".join(
+            literal if field_name is None else f"{literal}{kwargs[field_name]}"
+            for literal, field_name in self._parts
+        )
+
 
 class VLAnalyzer:
     """
@@ -32,34 +292,129 @@ class VLAnalyzer:
         self.api_base = config.VL_API_BASE
         self.batch_size = config.DEFAULT_BATCH_SIZE
         
-        # 创建单页分析模板
-        self.single_page_template = PromptTemplate(
-            input_variables=["page_index", "page_title"],
-            template=VL_SINGLE_PAGE_TEMPLATE
-        )
+        # 预先拆分提示词模板，格式化时只需拼接字符串
+        self.single_page_template = _PreparedTemplate(VL_SINGLE_PAGE_TEMPLATE)
+        self.batch_pages_template = _PreparedTemplate(VL_BATCH_PAGES_TEMPLATE)
+        self.summary_template = _PreparedTemplate(VL_SUMMARY_TEMPLATE)
+        self.document_summary_template = self.summary_template
         
-        # 创建批量页面分析模板
-        self.batch_pages_template = PromptTemplate(
-            input_variables=["page_count", "pages_info", "page_indexes_placeholder", "page_titles_placeholder"],
-            template=VL_BATCH_PAGES_TEMPLATE
-        )
+        # 初始化缓存管理器
+        self.cache_manager = CacheManager()
         
-        # 创建摘要模板
-        self.summary_template = PromptTemplate(
-            input_variables=["document_title", "total_pages"],
-            template=VL_SUMMARY_TEMPLATE
+        # 用于并行调整图像大小和编码的线程池，在各批次之间复用
+        # 缩放和编码是CPU密集操作（Pillow在C代码中释放GIL），线程数与CPU核心数一致
+        self._io_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        # 每个线程独立的图像编码缓冲区
+        self._tls = threading.local()
+        
+        # 当前文档预先提交编码的页面图像：图像路径 -> 编码任务
+        self._encoded_pages: Dict[str, Future] = {}
+        
+        # 已编码图像的LRU缓存，按(路径, 修改时间, 文件大小, 最大尺寸)索引，文件修改后自动失效
+        self._encode_cached = lru_cache(maxsize=config.VL_ENCODE_CACHE_SIZE)(self._encode_for_cache)
+        
+        # 持久的HTTP客户端，复用连接，避免每次请求重新建立TCP/TLS连接
+        self._client = httpx.Client(
+            base_url=self.api_base or "",
+            http2=_HTTP2_AVAILABLE,
+            # 多页批次生成较长的分析可能需要数分钟，读取超时需足够长
+            timeout=httpx.Timeout(600.0, connect=10.0),
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=8),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.api_key}"
+            }
         )
         
-        # 创建文档摘要模板
-        self.document_summary_template = PromptTemplate(
-            input_variables=["document_title", "total_pages", "page_analyses"],
-            template=VL_SUMMARY_TEMPLATE
+        # 生成摘要和笔记使用的文本LLM客户端，首次使用时创建并在之后的调用中复用
+        self._llm_client: Optional[OpenAI] = None
+        
+        # 已确认存在的输出目录，同一目录只检查和创建一次
+        self._output_dirs: set = set()
+    
+    def _get_llm_client(self) -> OpenAI:
+        """
+        获取复用的文本LLM客户端，底层连接池在多次摘要和笔记生成之间共享
+        
+        Returns:
+            OpenAI: 文本LLM客户端
+        """
+        if self._llm_client is None:
+            self._llm_client = OpenAI(
+                api_key=config.OPENAI_API_KEY,
+                base_url=config.OPENAI_API_BASE,
+                # 与OpenAI SDK默认的超时一致，生成较长笔记时读取可能需要数分钟
+                http_client=httpx.Client(
+                    http2=_HTTP2_AVAILABLE,
+                    timeout=httpx.Timeout(600.0, connect=5.0),
+                    follow_redirects=True
+                )
+            )
+        return self._llm_client
+    
+    def _chat_completion(self, system_prompt: str, prompt: str, temperature: float, max_tokens: int,
+                         input_file: str = None) -> str:
+        """
+        调用文本LLM生成回复，相同的请求直接返回缓存的结果
+        
+        按模型、消息和生成参数计算内容键，与输入文件无关，因此重新处理内容未变的文档
+        或以相同分析结果重新生成时都能命中缓存。条目会记录使用过它的输入文件，按文件清除缓存
+        （--clear-cache）时只清除该文件的条目，之后重新生成会重新调用API。温度较高的请求结果不稳定，不缓存。
+        
+        Args:
+            system_prompt: 系统提示词
+            prompt: 用户提示词
+            temperature: 生成温度
+            max_tokens: 最大生成token数
+            input_file: 输入文件路径，记录为缓存条目的来源
+            
+        Returns:
+            str: 去除首尾空白后的回复内容
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        
+        request_key = None
+        if temperature <= _LLM_CACHE_MAX_TEMPERATURE:
+            request = json.dumps([config.DEFAULT_MODEL, messages, temperature, max_tokens], ensure_ascii=False)
+            request_key = hashlib.blake2b(request.encode("utf-8"), digest_size=16).hexdigest()
+            cached_content = self.cache_manager.load_cache_by_key(LLM_CACHE_NAMESPACE, request_key, input_file)
+            if cached_content is not None:
+                logger.info("找到相同提示词的缓存结果，跳过API调用")
+                return cached_content
+        
+        response = self._get_llm_client().chat.completions.create(
+            model=config.DEFAULT_MODEL,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
         )
+        content = response.choices[0].message.content.strip()
         
-        # 初始化缓存管理器
-        self.cache_manager = CacheManager()
+        if request_key is not None and content:
+            self.cache_manager.save_cache_by_key(LLM_CACHE_NAMESPACE, request_key, content, input_file)
+        
+        return content
     
-    def _encode_image(self, image_path: str) -> str:
+    def close(self) -> None:
+        """
+        关闭HTTP客户端和线程池
+        """
+        self._client.close()
+        if self._llm_client is not None:
+            self._llm_client.close()
+            self._llm_client = None
+        self._io_pool.shutdown(wait=False)
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
+    def _encode_image(self, image_path: str) -> bytes:
         """
         将图像编码为base64格式
         
@@ -67,76 +422,162 @@ class VLAnalyzer:
             image_path: 图像文件路径
             
         Returns:
-            str: base64编码的图像字符串
+            bytes: base64编码的图像数据（ASCII字节串）
         """
         try:
-            # 首先检查图片大小并在需要时调整
-            image_path = self._resize_image_if_needed(image_path)
-            
-            with open(image_path, "rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode("utf-8")
-            return encoded_string
+            st = os.stat(image_path)
+            return self._encode_cached(image_path, st.st_mtime_ns, st.st_size, 1200)
         except Exception as e:
-            print(f"编码图像时出错: {e}")
+            logger.error("编码图像时出错: %s", e)
             raise e
     
-    def _resize_image_if_needed(self, image_path: str, max_size: int = 1200) -> str:
+    def _encode_batch_images(self, image_paths: List[str]) -> List[bytes]:
         """
-        如果图像尺寸超过最大限制，调整图片大小以减少token消耗
+        并行编码一批图像，按文件内容去重，重复的页面直接复用已编码的结果
+        
+        Args:
+            image_paths: 图像文件路径列表
+            
+        Returns:
+            List[bytes]: 与输入顺序一致的base64编码图像数据列表
+        """
+        # 图像已在文档开始分析时按内容去重并提交编码，直接等待编码结果
+        if all(image_path in self._encoded_pages for image_path in image_paths):
+            return [self._encoded_pages[image_path].result() for image_path in image_paths]
+        
+        digests = list(self._io_pool.map(_file_digest, image_paths))
+        
+        # 每个内容摘要只保留第一次出现的图像路径
+        unique_paths: Dict[bytes, str] = {}
+        for digest, image_path in zip(digests, image_paths):
+            unique_paths.setdefault(digest, image_path)
+        
+        if len(unique_paths) < len(image_paths):
+            logger.info("批次中有 %s 张重复图像，跳过重复编码", len(image_paths) - len(unique_paths))
+        
+        encoded = dict(zip(unique_paths, self._io_pool.map(self._encode_image, unique_paths.values())))
+        return [encoded[digest] for digest in digests]
+    
+    def _prefetch_images(self, image_paths: List[str]) -> Dict[str, Future]:
+        """
+        把图像提交到编码线程池，按文件内容去重，内容相同的路径共用同一个编码任务
+        
+        Args:
+            image_paths: 图像文件路径列表
+            
+        Returns:
+            Dict[str, Future]: 图像路径到编码任务的映射
+        """
+        unique_paths = list(dict.fromkeys(image_paths))
+        digests = list(self._io_pool.map(_file_digest, unique_paths))
+        
+        encoded_pages: Dict[str, Future] = {}
+        futures: Dict[bytes, Future] = {}
+        for digest, image_path in zip(digests, unique_paths):
+            if digest not in futures:
+                futures[digest] = self._io_pool.submit(self._encode_image, image_path)
+            encoded_pages[image_path] = futures[digest]
+        
+        if len(futures) < len(unique_paths):
+            logger.info("文档中有 %s 张重复图像，跳过重复编码", len(unique_paths) - len(futures))
+        
+        return encoded_pages
+    
+    def _encode_for_cache(self, image_path: str, mtime_ns: int, size: int, max_size: int) -> bytes:
+        """
+        供LRU缓存调用的编码函数，mtime_ns和size仅作为缓存键的一部分
+        
+        Args:
+            image_path: 图像文件路径
+            mtime_ns: 图像文件的修改时间（纳秒）
+            size: 图像文件大小（字节）
+            max_size: 最大允许的宽度和高度（像素）
+            
+        Returns:
+            bytes: base64编码的图像数据
+        """
+        return self._load_and_encode(image_path, max_size)
+    
+    def _load_and_encode(self, image_path: str, max_size: int = 1200) -> bytes:
+        """
+        读取图像，在内存中按需调整大小后编码为base64，不产生临时文件
         
         Args:
             image_path: 图像文件路径
             max_size: 最大允许的宽度和高度（像素）
             
         Returns:
-            str: 调整大小后的图像路径或原始路径
+            bytes: base64编码的图像数据，直接拼接进请求体，无需解码为字符串
+        """
+        with Image.open(image_path) as img:
+            resized_img = self._resize_image_if_needed(img, max_size)
+            
+            # 尺寸未超出限制，直接编码原始文件内容
+            if resized_img is None:
+                fd = os.open(image_path, os.O_RDONLY)
+                try:
+                    raw = os.read(fd, os.fstat(fd).st_size)
+                finally:
+                    os.close(fd)
+                return base64.b64encode(raw)
+            
+            if simplejpeg is not None:
+                jpeg_bytes = simplejpeg.encode_jpeg(np.asarray(resized_img), quality=90, colorspace="RGB", fastdct=True)
+                return base64.b64encode(jpeg_bytes)
+            
+            # 复用当前线程的内存缓冲区，避免每页重新分配
+            buffer = getattr(self._tls, "buffer", None)
+            if buffer is None:
+                buffer = self._tls.buffer = io.BytesIO()
+            buffer.seek(0)
+            buffer.truncate()
+            resized_img.save(buffer, format="JPEG", quality=90)
+            with buffer.getbuffer() as data:
+                return base64.b64encode(data)
+    
+    def _resize_image_if_needed(self, img: Image.Image, max_size: int = 1200) -> Optional[Image.Image]:
+        """
+        如果图像尺寸超过最大限制，调整图片大小以减少token消耗
+        
+        Args:
+            img: 已打开的图像，需要调整时会被原地缩小
+            max_size: 最大允许的宽度和高度（像素）
+            
+        Returns:
+            Optional[Image.Image]: 调整大小后的RGB图像，无需调整或调整失败时返回None
         """
         try:
-            # 打开图像并检查尺寸
-            with Image.open(image_path) as img:
-                width, height = img.size
-                
-                # 如果图像宽度或高度超过限制，则调整大小
-                if width > max_size or height > max_size:
-                    # 计算缩放比例
-                    ratio = min(max_size / width, max_size / height)
-                    
-                    # 计算新尺寸
-                    new_width = int(width * ratio)
-                    new_height = int(height * ratio)
-                    
-                    print(f"调整图片大小: {width}x{height} -> {new_width}x{new_height}")
-                    
-                    # 调整图像大小
-                    resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-                    
-                    # 创建临时目录
-                    temp_dir = os.path.join(os.path.dirname(os.path.abspath(image_path)), "temp")
-                    os.makedirs(temp_dir, exist_ok=True)
-                    
-                    # 创建新的文件路径
-                    file_name = os.path.basename(image_path)
-                    resized_path = os.path.join(temp_dir, f"resized_{file_name}")
-                    
-                    # 保存调整大小后的图像
-                    resized_img.save(resized_path, optimize=True, quality=90)
-                    
-                    return resized_path
+            width, height = img.size
+            
+            # 如果图像宽度和高度都未超过限制，则无需调整
+            if width <= max_size and height <= max_size:
+                return None
+            
+            # JPEG图像可在解码时直接按1/2、1/4等比例缩小，减少解码和缩放的计算量
+            if img.format == "JPEG":
+                img.draft("RGB", (max_size, max_size))
+            
+            # thumbnail保持宽高比原地缩放，reducing_gap先做快速的整数倍缩小再进行LANCZOS重采样
+            img.thumbnail((max_size, max_size), Image.LANCZOS, reducing_gap=3.0)
+            logger.info("调整图片大小: %sx%s -> %sx%s", width, height, img.width, img.height)
+            
+            # JPEG编码要求RGB模式
+            resized_img = img if img.mode == "RGB" else img.convert("RGB")
             
-            # 如果不需要调整大小，则返回原始路径
-            return image_path
+            return resized_img
         
         except Exception as e:
-            print(f"调整图像大小时出错: {e}")
-            # 出错时返回原始路径
-            return image_path
+            logger.error("调整图像大小时出错: %s", e)
+            # 出错时使用原始图像
+            return None
     
-    def analyze_single_page(self, page_data: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_single_page(self, page_data: Dict[str, Any], input_file: str = None) -> Dict[str, Any]:
         """
         分析单个页面图像
         
         Args:
             page_data: 包含页面数据的字典
+            input_file: 输入文件路径，记录为API响应缓存的来源
             
         Returns:
             Dict: 包含分析结果的字典
@@ -146,11 +587,9 @@ class VLAnalyzer:
             page_title = page_data["title"]
             image_path = page_data["image_path"]
             
-            # 调整图像大小（如果需要）
-            sized_image_path = self._resize_image_if_needed(image_path)
-            
-            # 编码图像
-            base64_image = self._encode_image(sized_image_path)
+            # 编码图像（必要时调整大小），已预先提交编码时直接等待结果
+            encoded_page = self._encoded_pages.get(image_path)
+            base64_image = encoded_page.result() if encoded_page else self._encode_image(image_path)
             
             # 准备提示词
             prompt = self.single_page_template.format(
@@ -159,14 +598,7 @@ class VLAnalyzer:
             )
             
             # 调用API
-            response = self._call_vl_api(prompt, [base64_image])
-            
-            # 如果调整了图像大小，删除临时文件
-            if sized_image_path != image_path:
-                try:
-                    os.remove(sized_image_path)
-                except:
-                    pass
+            response = self._call_vl_api(VL_SINGLE_PAGE_INSTRUCTIONS, prompt, [base64_image], input_file)
             
             # 更新页面数据
             page_data["analysis"] = response
@@ -174,16 +606,17 @@ class VLAnalyzer:
             return page_data
             
         except Exception as e:
-            print(f"分析页面图像时出错: {e}")
-            page_data["analysis"] = "分析失败"
+            logger.error("分析页面图像时出错: %s", e)
+            page_data["analysis"] = _ANALYSIS_FAILED
             return page_data
     
-    def analyze_batch_pages(self, pages_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def analyze_batch_pages(self, pages_data: List[Dict[str, Any]], input_file: str = None) -> List[Dict[str, Any]]:
         """
         批量分析多个页面图像
         
         Args:
             pages_data: 包含多个页面数据的列表
+            input_file: 输入文件路径，记录为API响应缓存的来源
             
         Returns:
             List[Dict]: 包含分析结果的页面数据列表
@@ -196,34 +629,17 @@ class VLAnalyzer:
             # 准备页面信息文本
             pages_info = "\n".join([f"页面 {idx}: {title}" for idx, title in zip(page_indexes, page_titles)])
             
-            # 调整图像大小并编码
-            base64_images = []
-            sized_paths = []
-            
-            for page in pages_data:
-                image_path = page["image_path"]
-                sized_path = self._resize_image_if_needed(image_path)
-                sized_paths.append(sized_path)
-                base64_images.append(self._encode_image(sized_path))
+            # 并行调整图像大小并编码，内容相同的图像只编码一次
+            base64_images = self._encode_batch_images([p["image_path"] for p in pages_data])
             
             # 准备提示词
             prompt = self.batch_pages_template.format(
                 page_count=len(pages_data),
-                pages_info=pages_info,
-                page_indexes_placeholder=", ".join([str(idx) for idx in page_indexes]),
-                page_titles_placeholder=", ".join(page_titles)
+                pages_info=pages_info
             )
             
             # 调用API
-            response = self._call_vl_api(prompt, base64_images)
-            
-            # 清理调整大小的临时文件
-            for i, sized_path in enumerate(sized_paths):
-                if sized_path != pages_data[i]["image_path"]:
-                    try:
-                        os.remove(sized_path)
-                    except:
-                        pass
+            response = self._call_vl_api(VL_BATCH_PAGES_INSTRUCTIONS, prompt, base64_images, input_file)
             
             # 尝试解析响应并分配给各个页面
             try:
@@ -235,7 +651,7 @@ class VLAnalyzer:
                     if i < len(page_sections):
                         page["analysis"] = page_sections[i]
                     else:
-                        page["analysis"] = "无法提取该页面的分析结果"
+                        page["analysis"] = _ANALYSIS_MISSING
             except:
                 # 如果无法分割，则将整个响应复制到所有页面
                 for page in pages_data:
@@ -244,9 +660,9 @@ class VLAnalyzer:
             return pages_data
             
         except Exception as e:
-            print(f"批量分析页面图像时出错: {e}")
+            logger.error("批量分析页面图像时出错: %s", e)
             for page in pages_data:
-                page["analysis"] = "分析失败"
+                page["analysis"] = _ANALYSIS_FAILED
             return pages_data
     
     def _split_response_by_pages(self, response: str, page_indexes: List[int]) -> List[str]:
@@ -262,35 +678,25 @@ class VLAnalyzer:
         """
         sections = []
         
-        # 寻找页面标记
+        # 一次扫描找出所有页面标记，每页优先使用“## 页面 N”标题，其次是其他“页面 N”写法，最后是“第N页”
+        positions = {}
+        for match in _PAGE_MARK_RE.finditer(response):
+            if match.group(3) is not None:
+                idx, priority = int(match.group(3)), 2
+            else:
+                idx, priority = int(match.group(2)), 0 if match.group(1) else 1
+            
+            if idx not in positions or priority < positions[idx][0]:
+                positions[idx] = (priority, match.start())
+        
         for i, idx in enumerate(page_indexes):
-            # 构建可能的页面标记模式
-            patterns = [
-                f"## 页面 {idx}",
-                f"页面 {idx}",
-                f"**页面 {idx}**",
-                f"页面{idx}",
-                f"第{idx}页"
-            ]
-            
-            start_pos = -1
-            
-            # 查找当前页面的起始位置
-            for pattern in patterns:
-                pos = response.find(pattern)
-                if pos != -1:
-                    start_pos = pos
-                    break
-            
-            # 查找下一页面的起始位置
+            # 当前页面的起始位置
+            start_pos = positions[idx][1] if idx in positions else -1
+            
+            # 下一页面的起始位置
             end_pos = len(response)
-            if i < len(page_indexes) - 1:
-                next_idx = page_indexes[i + 1]
-                for pattern in [f"## 页面 {next_idx}", f"页面 {next_idx}", f"**页面 {next_idx}**", f"页面{next_idx}", f"第{next_idx}页"]:
-                    pos = response.find(pattern)
-                    if pos != -1:
-                        end_pos = pos
-                        break
+            if i < len(page_indexes) - 1 and page_indexes[i + 1] in positions:
+                end_pos = positions[page_indexes[i + 1]][1]
             
             # 提取当前页面的内容
             if start_pos != -1:
@@ -304,70 +710,162 @@ class VLAnalyzer:
         
         return sections
     
-    def _call_vl_api(self, prompt: str, base64_images: List[str]) -> str:
+    def _call_vl_api(self, instructions: str, prompt: str, base64_images: List[bytes],
+                     input_file: str = None) -> str:
         """
         调用多模态API以分析图像
         
+        固定的指令放在最前面的系统消息中，随页面变化的内容放在其后的用户消息中，
+        同一文档的各次请求共享完全相同的前缀，可命中服务端的提示词前缀缓存。
+        
         Args:
-            prompt: 提示词
-            base64_images: base64编码图像列表
+            instructions: 固定的分析指令，作为系统消息发送
+            prompt: 当前页面的提示词
+            base64_images: base64编码图像数据列表
+            input_file: 输入文件路径，记录为响应缓存的来源，按文件清除缓存时据此查找
             
         Returns:
             str: API响应内容
-        """
-        try:
-            # 准备消息内容
-            content = [{"type": "text", "text": prompt}]
-            
-            # 添加图像到内容中
-            for i, img in enumerate(base64_images):
-                content.append({
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/jpeg;base64,{img}"}
-                })
-            
-            # 准备API请求数据
-            data = {
-                "model": self.model_name,
-                "messages": [
-                    {
-                        "role": "system", 
-                        "content": "你是一个专业的文档分析助手。分析图像中的内容并提供详细、准确的描述和摘要。"
-                    },
-                    {
-                        "role": "user",
-                        "content": content
-                    }
-                ],
-                "max_tokens": 4000,
-                "temperature": 0.3
-                # 移除 JSON 模式
-            }
             
-            # 发送API请求
-            response = requests.post(
-                f"{self.api_base}/chat/completions",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {self.api_key}"
+        Raises:
+            RuntimeError: API返回非200状态码
+            httpx.HTTPError: 网络错误或请求超时
+        """
+        # 准备消息内容
+        content = [{"type": "text", "text": prompt}]
+        
+        # 添加图像到内容中，先用占位符代替，序列化后再拼接图像数据
+        for _ in base64_images:
+            content.append({
+                "type": "image_url",
+                "image_url": {"url": _IMAGE_URL_PLACEHOLDER}
+            })
+        
+        # 准备API请求数据
+        data = {
+            "model": self.model_name,
+            "messages": [
+                {
+                    "role": "system", 
+                    "content": instructions
                 },
-                json=data
-            )
-            
-            # 检查响应状态
-            if response.status_code == 200:
-                response_json = response.json()
-                return response_json["choices"][0]["message"]["content"]
+                {
+                    "role": "user",
+                    "content": content
+                }
+            ],
+            "max_tokens": 4000,
+            "temperature": 0.3
+            # 移除 JSON 模式
+        }
+        
+        # 序列化请求体，优先使用orjson
+        if orjson is not None:
+            body = orjson.dumps(data)
+        else:
+            body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        
+        # 将占位符替换为图像的data URL，base64字符无需JSON转义，可直接拼接字节串
+        body_parts = body.split(_IMAGE_URL_TOKEN)
+        body_chunks = [body_parts[0]]
+        for img, part in zip(base64_images, body_parts[1:]):
+            body_chunks.extend((_IMAGE_URL_PREFIX, img, b'"', part))
+        body = b"".join(body_chunks)
+        
+        # 相同的请求体（模型、提示词、图像和参数均相同）直接使用缓存的响应
+        request_key = hashlib.blake2b(body, digest_size=16).hexdigest()
+        cached_response = self.cache_manager.load_cache_by_key(API_CACHE_NAMESPACE, request_key, input_file)
+        if cached_response is not None:
+            return cached_response
+        
+        # 发送API请求
+        response = self._post_with_retry(body)
+        
+        # 检查响应状态
+        if response.status_code == 200:
+            if orjson is not None:
+                response_json = orjson.loads(response.content)
             else:
-                print(f"API请求失败: 状态码 {response.status_code}")
-                print(f"响应: {response.text}")
-                return f"API请求失败: {response.status_code}\n{response.text}"
+                response_json = json.loads(response.content)
+            result = response_json["choices"][0]["message"]["content"]
+            
+            # 只缓存成功的响应，失败的请求下次仍会重试
+            self.cache_manager.save_cache_by_key(API_CACHE_NAMESPACE, request_key, result, input_file)
+            return result
+        else:
+            logger.error("API请求失败: 状态码 %s", response.status_code)
+            logger.error("响应: %s", response.text)
+            # 失败时抛出异常，由调用方标记为分析失败，避免把错误信息当作分析结果
+            raise RuntimeError(f"API请求失败: {response.status_code}")
+    
+    def _post_with_retry(self, body: bytes) -> httpx.Response:
+        """
+        发送API请求，遇到限流、服务端错误或连接错误时按指数退避重试
+        
+        Args:
+            body: 序列化后的请求体
             
-        except Exception as e:
-            print(f"调用API时出错: {e}")
-            return f"API请求错误: {str(e)}"
+        Returns:
+            httpx.Response: 最后一次请求的响应
+        """
+        for attempt in range(config.VL_MAX_RETRIES + 1):
+            try:
+                response = self._client.post("/chat/completions", content=body)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError) as e:
+                if attempt >= config.VL_MAX_RETRIES:
+                    raise
+                delay = self._retry_delay(attempt, None)
+                logger.warning("连接API失败: %s，%.1f 秒后重试（第 %s 次）", e, delay, attempt + 1)
+                time.sleep(delay)
+                continue
+            
+            if response.status_code not in _RETRY_STATUS_CODES or attempt >= config.VL_MAX_RETRIES:
+                return response
+            
+            delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+            logger.warning("API请求返回状态码 %s，%.1f 秒后重试（第 %s 次）", response.status_code, delay, attempt + 1)
+            time.sleep(delay)
+        
+        return response
+    
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+        """
+        计算重试前的等待时间，优先使用服务端返回的Retry-After
+        
+        Args:
+            attempt: 已失败的次数（从0开始）
+            retry_after: 响应头中的Retry-After（秒），没有时为None
+            
+        Returns:
+            float: 等待秒数
+        """
+        try:
+            if retry_after is not None:
+                return min(max(float(retry_after), 0.0), _MAX_RETRY_DELAY)
+        except ValueError:
+            # Retry-After也可能是HTTP日期格式，此时退回指数退避
+            pass
+        # 指数退避加随机抖动，避免并发批次同时重试
+        return min(2.0 ** attempt + random.random(), _MAX_RETRY_DELAY)
     
-    def analyze_document(self, pages_data: List[Dict[str, Any]], batch_size: int = None, input_file: str = None) -> List[Dict[str, Any]]:
+    def _dispatch_batch(self, batch: List[Dict[str, Any]], input_file: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        分析一个批次的页面，批次只有一页时使用单页分析
+        
+        Args:
+            batch: 一个批次的页面数据列表
+            input_file: 输入文件路径，记录为API响应缓存的来源
+            
+        Returns:
+            List[Dict]: 包含分析结果的页面数据列表
+        """
+        if len(batch) == 1:
+            return [self.analyze_single_page(batch[0], input_file)]
+        return self.analyze_batch_pages(batch, input_file)
+    
+    def analyze_document(self, pages_data: List[Dict[str, Any]], batch_size: int = None, input_file: str = None,
+                         max_concurrency: int = None) -> List[Dict[str, Any]]:
         """
         分析整个文档的所有页面
         
@@ -375,89 +873,101 @@ class VLAnalyzer:
             pages_data: 包含所有页面数据的列表
             batch_size: 批处理大小，默认使用配置中的值
             input_file: 输入文件路径，用于缓存
+            max_concurrency: 同时发送的批次请求数量上限，默认使用配置中的值
             
         Returns:
             List[Dict]: 包含分析结果的页面数据列表
         """
         batch_size = batch_size or self.batch_size
+        max_concurrency = max_concurrency or config.VL_CONCURRENCY
         
-        # 检查是否有缓存
+        # 已缓存的分析进度，按页面索引存储，只在开始时从磁盘加载一次
         cache_key = f"vl_analyze"
-        if input_file and self.cache_manager.has_cache(input_file, cache_key, self.model_name):
-            print(f"找到缓存的PPT图像分析结果，正在加载...")
-            cached_data = self.cache_manager.load_cache(input_file, cache_key, self.model_name)
-            
-            # 将缓存数据与输入页面数据合并
-            # 确保使用最新的metadata (如image_path)，但保留分析结果
-            for i, page_data in enumerate(pages_data):
-                if i < len(cached_data):
-                    # 保留原始页面数据，但更新分析结果
-                    page_data["analysis"] = cached_data[i]["analysis"]
-            
-            print(f"已从缓存加载 {len(cached_data)} 页PPT图像分析结果")
+        cached_pages: Dict[int, Dict[str, Any]] = {}
+        if input_file:
+            for page in self.cache_manager.load_cache(input_file, cache_key, self.model_name) or []:
+                cached_pages[page["index"]] = page
+        
+        # 将缓存的分析结果合并到页面数据中，确保使用最新的metadata (如image_path)
+        pending_pages = []
+        for page_data in pages_data:
+            cached_page = cached_pages.get(page_data["index"])
+            if cached_page is not None:
+                page_data["analysis"] = cached_page["analysis"]
+            else:
+                pending_pages.append(page_data)
+        
+        if not pending_pages:
+            logger.info("已从缓存加载 %s 页PPT图像分析结果", len(pages_data))
             return pages_data
         
-        print(f"开始使用VL模型({self.model_name})分析PPT图像，共 {len(pages_data)} 页...")
-        print(f"批处理大小: {batch_size}")
+        if cached_pages:
+            logger.info("已从缓存加载 %s 页PPT图像分析结果，继续分析剩余 %s 页", len(pages_data) - len(pending_pages), len(pending_pages))
         
-        analyzed_pages = []
+        logger.info("开始使用VL模型(%s)分析PPT图像，共 %s 页...", self.model_name, len(pending_pages))
+        logger.info("批处理大小: %s", batch_size)
         
-        # 按批处理页面
-        for i in range(0, len(pages_data), batch_size):
-            batch = pages_data[i:i+batch_size]
-            
-            # 如果批次只有一页，使用单页分析
-            if len(batch) == 1:
-                analyzed_page = self.analyze_single_page(batch[0])
-                analyzed_pages.append(analyzed_page)
-                print(f"已分析第 {batch[0]['index']+1} 页（标题：{batch[0]['title'] or '无标题'}）")
-            else:
-                # 否则使用批量分析
-                analyzed_batch = self.analyze_batch_pages(batch)
-                analyzed_pages.extend(analyzed_batch)
-                page_nums = [p["index"]+1 for p in batch]
-                print(f"已分析第 {min(page_nums)} 到 {max(page_nums)} 页")
+        # 按批处理页面，多个批次并发请求，按完成顺序处理结果并保存进度
+        batches = [pending_pages[i:i+batch_size] for i in range(0, len(pending_pages), batch_size)]
+        
+        # 预先把所有页面图像提交到编码线程池，编码与API请求重叠进行，批次只需等待结果
+        self._encoded_pages = self._prefetch_images([p["image_path"] for p in pending_pages])
+        
+        try:
+            self._run_batches(batches, max_concurrency, input_file, cache_key, cached_pages)
+        finally:
+            self._encoded_pages = {}
+        
+        logger.info("已完成全部 %s 页文档分析，结果已%s", len(pages_data), '缓存' if input_file else '生成（未启用缓存）')
+        
+        return pages_data
+    
+    def _run_batches(self, batches: List[List[Dict[str, Any]]], max_concurrency: int, input_file: Optional[str],
+                     cache_key: str, cached_pages: Dict[int, Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        并发分析所有批次，按完成顺序保存分析进度
+        
+        Args:
+            batches: 批次列表
+            max_concurrency: 同时发送的批次请求数量上限
+            input_file: 输入文件路径，用于缓存
+            cache_key: 分析进度的缓存键
+            cached_pages: 已缓存的分析进度，按页面索引存储
             
-            # 每处理完一个批次就保存中间结果到缓存
-            if input_file:
-                cache_data = [
-                    {"index": page["index"], "analysis": page.get("analysis", "")} 
-                    for page in analyzed_pages
-                ]
-                
-                # 检查是否已有之前保存的数据
-                existing_data = []
-                if self.cache_manager.has_cache(input_file, cache_key, self.model_name):
-                    existing_data = self.cache_manager.load_cache(input_file, cache_key, self.model_name)
+        Returns:
+            List[List[Dict]]: 与批次顺序一致的分析结果
+        """
+        batch_results: List[Optional[List[Dict[str, Any]]]] = [None] * len(batches)
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            futures = {executor.submit(self._dispatch_batch, batch, input_file): i for i, batch in enumerate(batches)}
+            for future in as_completed(futures):
+                batch_number = futures[future]
+                batch = batches[batch_number]
+                analyzed_batch = batch_results[batch_number] = future.result()
                 
-                # 合并已有数据和新数据
-                merged_data = list(existing_data)  # 复制现有数据
+                if len(batch) == 1:
+                    logger.info("已分析第 %s 页（标题：%s）", batch[0]['index']+1, batch[0]['title'] or '无标题')
+                else:
+                    page_nums = [p["index"]+1 for p in batch]
+                    logger.info("已分析第 %s 到 %s 页", min(page_nums), max(page_nums))
                 
-                # 更新或添加新分析的页面
-                for page in cache_data:
-                    page_index = page["index"]
-                    
-                    # 检查页面是否已存在于现有数据中
-                    found = False
-                    for i, existing_page in enumerate(merged_data):
-                        if existing_page["index"] == page_index:
-                            merged_data[i] = page  # 更新现有项
-                            found = True
-                            break
+                # 每处理完一个批次就保存中间结果到缓存
+                if input_file:
+                    # 更新或添加新分析的页面，分析失败的页面不缓存，下次运行时重新分析
+                    for page in analyzed_batch:
+                        analysis = page.get("analysis", "")
+                        if analysis in _FAILED_ANALYSES:
+                            logger.warning("第 %s 页分析失败，未写入缓存", page["index"] + 1)
+                            continue
+                        cached_pages[page["index"]] = {"index": page["index"], "analysis": analysis}
                     
-                    if not found:
-                        merged_data.append(page)  # 添加新项
-                
-                # 按页面索引排序
-                merged_data.sort(key=lambda x: x["index"])
-                
-                # 保存合并后的数据
-                self.cache_manager.save_cache(input_file, cache_key, self.model_name, merged_data)
-                print(f"已缓存当前分析进度：共 {len(merged_data)} 页")
+                    # 按页面索引排序后保存合并后的数据
+                    merged_data = [cached_pages[index] for index in sorted(cached_pages)]
+                    self.cache_manager.save_cache(input_file, cache_key, self.model_name, merged_data)
+                    logger.info("已缓存当前分析进度：共 %s 页", len(merged_data))
         
-        print(f"已完成全部 {len(analyzed_pages)} 页文档分析，结果已{'缓存' if input_file else '生成（未启用缓存）'}")
-        
-        return analyzed_pages
+        return batch_results
     
     def generate_document_summary(self, pages_data: List[Dict[str, Any]], document_title: str = None, input_file: str = None) -> str:
         """
@@ -472,12 +982,12 @@ class VLAnalyzer:
             str: 生成的文档摘要
         """
         try:
-            print(f"开始生成文档摘要，共 {len(pages_data)} 页...")
+            logger.info("开始生成文档摘要，共 %s 页...", len(pages_data))
             
             # 获取已缓存的摘要，如果有
             cache_key = "document_summary"
             if input_file and self.cache_manager.has_cache(input_file, cache_key, self.model_name):
-                print("找到缓存的文档摘要，正在加载...")
+                logger.info("找到缓存的文档摘要，正在加载...")
                 return self.cache_manager.load_cache(input_file, cache_key, self.model_name)
             
             # 准备分析数据
@@ -494,38 +1004,25 @@ class VLAnalyzer:
             prompt = self.document_summary_template.format(
                 document_title=document_title or "未命名文档",
                 total_pages=len(pages_data),
-                page_analyses=json.dumps(analyses, ensure_ascii=False, indent=2)
+                page_analyses=_dumps_indented(analyses)
             )
             
             # 调用API生成摘要
-            print(f"调用API生成文档摘要（模型：{config.DEFAULT_MODEL}）...")
-            client = OpenAI(
-                api_key=config.OPENAI_API_KEY,
-                base_url=config.OPENAI_API_BASE
-            )
-            response = client.chat.completions.create(
-                model=config.DEFAULT_MODEL,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的文档摘要助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=1000
-            )
-            
-            summary = response.choices[0].message.content.strip()
+            logger.info("调用API生成文档摘要（模型：%s）...", config.DEFAULT_MODEL)
+            summary = self._chat_completion("你是一个专业的文档摘要助手。", prompt, temperature=0.5, max_tokens=1000,
+                                           input_file=input_file)
             
-            print(f"已生成文档摘要：约 {len(summary)} 字符")
+            logger.info("已生成文档摘要：约 %s 字符", len(summary))
             
             # 缓存摘要
             if input_file:
                 self.cache_manager.save_cache(input_file, cache_key, self.model_name, summary)
-                print("文档摘要已缓存")
+                logger.info("文档摘要已缓存")
             
             return summary
             
         except Exception as e:
-            print(f"生成文档摘要时出错: {str(e)}")
+            logger.error("生成文档摘要时出错: %s", e)
             return f"无法生成文档摘要：{str(e)}"
     
     def generate_notes(self, pages_data: List[Dict[str, Any]], output_file: str, style: str = "detailed", include_images: bool = False, input_file: str = None) -> str:
@@ -546,19 +1043,19 @@ class VLAnalyzer:
             # 获取已缓存的笔记，如果有
             cache_key = f"notes_{style}_{'with_images' if include_images else 'no_images'}"
             if input_file and self.cache_manager.has_cache(input_file, cache_key, self.model_name):
-                print(f"找到缓存的PPT笔记（风格: {style}），正在加载...")
+                logger.info("找到缓存的PPT笔记（风格: %s），正在加载...", style)
                 return self.cache_manager.load_cache(input_file, cache_key, self.model_name)
             
-            print(f"开始生成PPT笔记（风格: {style}，包含图像: {include_images}），共 {len(pages_data)} 页...")
+            logger.info("开始生成PPT笔记（风格: %s，包含图像: %s），共 %s 页...", style, include_images, len(pages_data))
             
             # 验证页面数据
             if not isinstance(pages_data, list) or len(pages_data) == 0:
-                print("错误：无有效的页面数据用于生成笔记")
+                logger.error("错误：无有效的页面数据用于生成笔记")
                 return None
             
             # 如果检测到严重问题，禁用图片处理
             if include_images and not self._check_images_valid(pages_data):
-                print("检测到图片数据存在严重问题，已禁用图片处理功能")
+                logger.warning("检测到图片数据存在严重问题，已禁用图片处理功能")
                 include_images = False
             
             # 构建缓存标识符，包含样式和图片设置
@@ -566,7 +1063,7 @@ class VLAnalyzer:
             
             # 检查缓存
             if input_file and self.cache_manager.has_cache(input_file, cache_mode, self.model_name):
-                print(f"找到缓存的笔记内容（风格: {style}{'，包含图片' if include_images else ''}），正在加载...")
+                logger.info("找到缓存的笔记内容（风格: %s%s），正在加载...", style, '，包含图片' if include_images else '')
                 try:
                     notes = self.cache_manager.load_cache(input_file, cache_mode, self.model_name)
                     
@@ -578,117 +1075,54 @@ class VLAnalyzer:
                     if notes.startswith("```") and not notes.startswith("```python") and not notes.startswith("```java"):
                         notes = notes[3:]
                     
-                    # 写入笔记文件
-                    try:
-                        with open(output_file, "w", encoding="utf-8") as f:
-                            f.write(notes)
-                        
-                        print(f"已从缓存加载笔记内容并写入文件：{output_file}")
+                    # 写入笔记文件，写入失败时重新生成笔记
+                    if self._write_notes_to_file(notes, output_file):
+                        logger.info("已从缓存加载笔记内容并写入文件：%s", output_file)
                         return notes
-                    except Exception as e:
-                        print(f"写入缓存的笔记到文件时出错: {str(e)}")
                 except Exception as e:
-                    print(f"加载缓存笔记时出错: {str(e)}")
+                    logger.error("加载缓存笔记时出错: %s", e)
                     # 继续执行，重新生成笔记
             
-            print(f"开始生成{style}风格的笔记{'，包含图片' if include_images else ''}，共 {len(pages_data)} 页...")
+            logger.info("开始生成%s风格的笔记%s，共 %s 页...", style, '，包含图片' if include_images else '', len(pages_data))
             
             # 确保输出目录存在
             try:
-                output_dir = os.path.dirname(output_file)
-                if output_dir:
-                    ensure_directory_exists(output_dir)
+                self._ensure_output_dir(output_file)
             except Exception as e:
-                print(f"创建输出目录时出错: {str(e)}")
+                logger.error("创建输出目录时出错: %s", e)
             
             # 提取所有页面的分析结果
-            analyses = []
+            analyses: List[PageAnalysis] = []
             has_images = False
             has_full_pages = False
             
-            # 预处理：修复可能的image键名问题
-            for page in pages_data:
-                # 修复图片列表中的键名
-                images = page.get('images', [])
-                if images and isinstance(images, list):
-                    for i, img in enumerate(images):
-                        if isinstance(img, dict) and 'image' in img and 'relative_path' not in img:
-                            images[i]['relative_path'] = img['image']
-                
-                # 修复全页图片的键名
-                full_page = page.get('full_page_image')
-                if full_page and isinstance(full_page, dict) and 'image' in full_page and 'relative_path' not in full_page:
-                    page['full_page_image']['relative_path'] = full_page['image']
-            
+            # 一次遍历完成image键名修复和分析数据构建
             for page_data in pages_data:
                 try:
                     # 获取分析内容，确保处理缺失值
                     analysis = page_data.get("analysis", f"[页面 {page_data.get('index', 0) + 1} 无分析结果]")
                     
-                    # 获取图片列表，确保存在默认空列表
+                    # 规范化图片列表，并更新页面数据中的图片列表
                     images = page_data.get("images", [])
-                    
-                    # 检查图片列表是否为None，若是则设置为空列表
-                    if images is None:
-                        images = []
-                    elif not isinstance(images, list):
-                        images = []
-                        print(f"页面 {page_data.get('index', 0) + 1} 的图片列表格式无效，已重置为空列表")
-                    
-                    # 检查图片对象格式，确保所有必要的字段都存在
-                    processed_images = []
-                    for i, img in enumerate(images):
-                        if isinstance(img, dict):
-                            # 创建一个新的图片对象，包含所有必要的字段
-                            new_img = {}
-                            
-                            # 优先使用relative_path，如果不存在则尝试使用image
-                            if 'relative_path' in img:
-                                new_img['relative_path'] = img['relative_path']
-                            elif 'image' in img:
-                                new_img['relative_path'] = img['image']
-                            else:
-                                # 如果没有路径信息，跳过这个图片
-                                continue
-                            
-                            # 复制其他可能有用的字段
-                            new_img['index'] = img.get('index', i)
-                            new_img['type'] = img.get('type', 'image')
-                            new_img['description'] = img.get('description', f'图片 {i+1}')
-                            
-                            processed_images.append(new_img)
-                    
-                    # 替换原始图片列表
-                    images = processed_images
-                    
-                    # 更新页面数据中的图片列表
-                    page_data['images'] = images
+                    if images is not None and not isinstance(images, list):
+                        logger.warning("页面 %s 的图片列表格式无效，已重置为空列表", page_data.get('index', 0) + 1)
+                    images = page_data['images'] = _normalize_images(images)
                     
                     # 检查是否有图片和整页图片
-                    if images and len(images) > 0:
+                    if images:
                         has_images = True
-                        print(f"页面 {page_data.get('index', 0) + 1} 有 {len(images)} 张图片")
+                        logger.info("页面 %s 有 %s 张图片", page_data.get('index', 0) + 1, len(images))
                     
-                    # 安全地检查全页图片
+                    # 安全地检查全页图片，无效时设置为None
                     full_page_image = page_data.get("full_page_image", None)
                     if full_page_image:
-                        if isinstance(full_page_image, dict):
-                            # 确保存在relative_path字段
-                            if 'relative_path' not in full_page_image and 'image' in full_page_image:
-                                full_page_image['relative_path'] = full_page_image['image']
-                                
-                            if 'relative_path' in full_page_image:
-                                has_full_pages = True
-                                print(f"页面 {page_data.get('index', 0) + 1} 有全页图片")
-                            else:
-                                # 如果没有相对路径，则设置为None
-                                page_data["full_page_image"] = None
-                        else:
-                            # 如果不是字典，则设置为None
-                            page_data["full_page_image"] = None
+                        full_page_image = page_data["full_page_image"] = _normalize_full_page_image(full_page_image)
+                        if full_page_image:
+                            has_full_pages = True
+                            logger.info("页面 %s 有全页图片", page_data.get('index', 0) + 1)
                     
                     # 创建分析数据字典，确保所有可能的键都存在
-                    analysis_data = {
+                    analysis_data: PageAnalysis = {
                         "title": page_data.get("title", f"页面 {page_data.get('index', 0) + 1}"),
                         "content": analysis,
                         "images": images,
@@ -698,7 +1132,7 @@ class VLAnalyzer:
                     
                     analyses.append(analysis_data)
                 except Exception as e:
-                    print(f"处理页面 {page_data.get('index', 0) + 1} 数据时出错: {str(e)}")
+                    logger.error("处理页面 %s 数据时出错: %s", page_data.get('index', 0) + 1, e)
                     # 添加一个最小的有效数据条目
                     analyses.append({
                         "title": f"页面 {len(analyses) + 1}",
@@ -731,94 +1165,71 @@ class VLAnalyzer:
                 template_type = "无图片"
                 include_images = False  # 重置标志，确保不会尝试处理图片
             
-            print(f"使用模板：{template_type}，处理 {len(analyses)} 页内容...")
+            logger.info("使用模板：%s，处理 %s 页内容...", template_type, len(analyses))
             
+            # 调试: 序列化为JSON之前检查数据结构
+            logger.info("正在序列化分析数据为JSON...")
             try:
-                # 调试: 序列化为JSON之前检查数据结构
-                print("正在序列化分析数据为JSON...")
-                try:
-                    analyses_json = json.dumps(analyses, ensure_ascii=False, indent=2)
-                    print(f"JSON序列化成功，大小：{len(analyses_json)} 字符")
-                except Exception as e:
-                    print(f"JSON序列化失败: {str(e)}")
-                    # 尝试找出问题对象
-                    for i, item in enumerate(analyses):
-                        try:
-                            json.dumps(item)
-                        except Exception as e:
-                            print(f"第 {i+1} 项无法序列化: {str(e)}")
-                            # 尝试简化该项
-                            analyses[i] = {
-                                "title": item.get("title", f"页面 {i+1}"),
-                                "content": item.get("content", "[内容无法序列化]"),
-                                "images": [],
-                                "full_page_image": None,
-                                "index": i
-                            }
-                    
-                    # 重新尝试序列化
+                analyses_json = _dumps_indented(analyses)
+                logger.info("JSON序列化成功，大小：%s 字符", len(analyses_json))
+            except (TypeError, ValueError) as e:
+                logger.error("JSON序列化失败: %s", e)
+                # 尝试找出问题对象
+                for i, item in enumerate(analyses):
                     try:
-                        analyses_json = json.dumps(analyses, ensure_ascii=False, indent=2)
-                        print("简化后序列化成功")
-                    except Exception as e:
-                        print(f"简化后仍无法序列化: {str(e)}")
-                        # 使用最小化数据
-                        analyses = [{"title": f"页面 {i+1}", "content": "[数据结构错误]", "images": [], "full_page_image": None, "index": i} for i in range(len(analyses))]
-                        analyses_json = json.dumps(analyses, ensure_ascii=False, indent=2)
-                
-                prompt = template.format(
-                    style=style,
-                    analyses=analyses_json
-                )
+                        _dumps_indented(item)
+                    except (TypeError, ValueError) as e:
+                        logger.warning("第 %s 项无法序列化: %s", i+1, e)
+                        # 尝试简化该项
+                        analyses[i] = {
+                            "title": item.get("title", f"页面 {i+1}"),
+                            "content": item.get("content", "[内容无法序列化]"),
+                            "images": [],
+                            "full_page_image": None,
+                            "index": i
+                        }
                 
-                # 调用API生成笔记
-                print(f"调用API生成PPT笔记（模型：{config.DEFAULT_MODEL}）...")
-                client = OpenAI(
-                    api_key=config.OPENAI_API_KEY,
-                    base_url=config.OPENAI_API_BASE
-                )
-                response = client.chat.completions.create(
-                    model=config.DEFAULT_MODEL,
-                    messages=[
-                        {"role": "system", "content": "你是一个专业的PPT笔记助手。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=4000
-                )
-                
-                notes = response.choices[0].message.content.strip()
-                
-                # 将笔记写入文件
+                # 重新尝试序列化
                 try:
-                    # 确保输出目录存在
-                    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
-                    
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        f.write(notes)
-                    print(f"PPT笔记已成功写入到文件：{output_file}")
-                except Exception as e:
-                    print(f"写入笔记文件时出错：{str(e)}")
-                
-                # 缓存笔记
-                if input_file:
-                    cache_key = f"notes_{style}_{'with_images' if include_images else 'no_images'}"
-                    self.cache_manager.save_cache(input_file, cache_key, notes, self.model_name)
-                    print(f"PPT笔记已成功缓存（风格：{style}）")
-                
-                return notes
-            except Exception as e:
-                print(f"生成PPT笔记时出错：{str(e)}")
-                traceback.print_exc()
-                return None
+                    analyses_json = _dumps_indented(analyses)
+                    logger.info("简化后序列化成功")
+                except (TypeError, ValueError) as e:
+                    logger.error("简化后仍无法序列化: %s", e)
+                    # 使用最小化数据
+                    analyses = [{"title": f"页面 {i+1}", "content": "[数据结构错误]", "images": [], "full_page_image": None, "index": i} for i in range(len(analyses))]
+                    analyses_json = _dumps_indented(analyses)
+            
+            prompt = template.format(
+                style=style,
+                analyses=analyses_json
+            )
+            
+            # 调用API生成笔记
+            logger.info("调用API生成PPT笔记（模型：%s）...", config.DEFAULT_MODEL)
+            notes = self._chat_completion("你是一个专业的PPT笔记助手。", prompt, temperature=0.3, max_tokens=4000,
+                                         input_file=input_file)
+            
+            # 把模型输出的图像和完整页面图像占位符替换为实际图像引用
+            if include_images:
+                notes = self._process_placeholders(notes, pages_data)
+            
+            # 将笔记写入文件
+            self._write_notes_to_file(notes, output_file)
+            
+            # 缓存笔记
+            # 使用与查找缓存时相同的缓存标识符，下次生成时才能命中
+            if input_file:
+                self.cache_manager.save_cache(input_file, cache_mode, self.model_name, notes)
+                logger.info("PPT笔记已成功缓存（风格：%s）", style)
+            
+            return notes
         except Exception as e:
-            print(f"生成PPT笔记时出错：{str(e)}")
-            traceback.print_exc()
+            logger.error("生成PPT笔记时出错：%s", e, exc_info=True)
             return None
     
-    def _process_image_placeholders(self, notes: str, pages_data: List[Dict[str, Any]]) -> str:
+    def _process_placeholders(self, notes: str, pages_data: List[Dict[str, Any]]) -> str:
         """
-        处理笔记中的图像占位符，替换为实际图像引用
+        处理笔记中的图像和完整页面图像占位符，一次扫描替换为实际图像引用
         
         Args:
             notes: 笔记内容
@@ -827,181 +1238,97 @@ class VLAnalyzer:
         Returns:
             str: 处理后的笔记内容
         """
-        try:
-            print("【日志】开始执行_process_image_placeholders方法")
-            # 构建可用图像映射
-            image_map = {}
+        # 笔记中没有任何占位符时直接返回
+        if "{{{image:" not in notes and "{{{fullpage:" not in notes:
+            return notes
+        
+        logger.debug("开始执行_process_placeholders方法")
+        page_indices, img_indices, rel_paths, fullpage_map = _normalize_pages(pages_data)
+        
+        # 构建可用图像映射：(页面索引, 图片索引) -> 相对路径，同一键出现多次时以最后一个为准
+        image_map = dict(zip(zip(page_indices, img_indices), rel_paths))
+        logger.debug("构建了 %s 个图片映射", len(image_map))
+        
+        def replace_image(payload):
+            placeholder = payload.strip()
+            logger.debug("找到占位符: %s", placeholder)
             
-            for page_data in pages_data:
-                page_index = page_data.get("index", 0)
-                images = page_data.get("images", [])
-                
-                # 确保images是列表且不为None
-                if images is None:
-                    images = []
-                
-                print(f"【日志】处理页面 {page_index + 1} 的图片，数量: {len(images)}")
-                # 检查图像列表中的每个元素
-                for i, img in enumerate(images):
-                    print(f"【日志】处理图片 {i+1}，类型: {type(img)}")
-                    if isinstance(img, dict):
-                        print(f"【日志】图片 {i+1} 键: {list(img.keys())}")
-                    
-                    if isinstance(img, dict) and "index" in img:
-                        key = f"{page_index}_{img['index']}"
-                        print(f"【日志】添加图片映射 key={key}")
-                        image_map[key] = img
-                    elif isinstance(img, dict) and "relative_path" in img:
-                        # 如果没有索引但有路径，使用列表索引作为图片索引
-                        img_with_index = img.copy()
-                        img_with_index["index"] = i
-                        key = f"{page_index}_{i}"
-                        print(f"【日志】添加替代图片映射 key={key}")
-                        image_map[key] = img_with_index
-            
-            print(f"【日志】构建了 {len(image_map)} 个图片映射")
-            
-            # 查找并替换图像占位符标签
-            import re
-            
-            # 定义图像占位符模式
-            # 格式为: {{{image: page_x_img_y description}}}
-            pattern = r"\{\{\{image:([^}]*)\}\}\}"
-            print(f"【日志】使用正则模式: {pattern}")
-            
-            def replace_image(match):
-                try:
-                    placeholder = match.group(1).strip()
-                    print(f"【日志】找到占位符: {placeholder}")
-                    parts = placeholder.split(" ", 1)
-                    
-                    if len(parts) == 0:
-                        print("【日志】占位符格式错误，无法分割")
-                        return match.group(0)  # 保持原样
-                    
-                    # 解析图像标识符和描述
-                    img_id = parts[0].strip()
-                    description = parts[1].strip() if len(parts) > 1 else ""
-                    
-                    print(f"【日志】图片ID: {img_id}, 描述: {description}")
-                    
-                    # 尝试解析页面和图像索引
-                    try:
-                        if img_id.startswith("page") and "_img" in img_id:
-                            print(f"【日志】解析图片ID: {img_id}")
-                            page_str, img_str = img_id.replace("page", "").split("_img")
-                            page_index = int(page_str) - 1  # 转换为0索引
-                            img_index = int(img_str) - 1    # 转换为0索引
-                            
-                            key = f"{page_index}_{img_index}"
-                            print(f"【日志】查找映射键: {key}, 是否存在: {key in image_map}")
-                            
-                            if key in image_map:
-                                img_info = image_map[key]
-                                print(f"【日志】找到图片信息: {list(img_info.keys())}")
-                                
-                                if "relative_path" in img_info:
-                                    relative_path = img_info["relative_path"]
-                                    print(f"【日志】使用相对路径: {relative_path}")
-                                    
-                                    if description:
-                                        return f"![{description}]({relative_path})"
-                                    else:
-                                        return f"![图片 {img_id}]({relative_path})"
-                                else:
-                                    print(f"【错误】图片信息缺少relative_path字段")
-                                    print(f"【错误】图片信息内容: {img_info}")
-                            else:
-                                print(f"【日志】在映射中找不到键: {key}")
-                    except Exception as e:
-                        print(f"【错误】处理图片引用时出错: {str(e)}")
-                        import traceback
-                        print(f"【错误】详细堆栈: {traceback.format_exc()}")
-                except Exception as e:
-                    print(f"【错误】替换图片占位符时出错: {str(e)}")
-                    import traceback
-                    print(f"【错误】详细堆栈: {traceback.format_exc()}")
-                
-                # 如果无法解析或找不到图像，保持原样
-                return match.group(0)
+            # 解析图像标识符和描述，占位符两端已去除空白，描述只需去除开头多余的空格
+            img_id, _, description = placeholder.partition(" ")
+            description = description.lstrip()
             
-            # 替换所有图像占位符
-            print("【日志】开始替换图像占位符")
-            processed_notes = re.sub(pattern, replace_image, notes)
-            print("【日志】完成图像占位符替换")
+            logger.debug("图片ID: %s, 描述: %s", img_id, description)
             
-            return processed_notes
-        except Exception as e:
-            print(f"【错误】处理图片占位符时出错: {str(e)}")
-            import traceback
-            print(f"【错误】详细堆栈: {traceback.format_exc()}")
-            # 出错时返回原始笔记内容
-            return notes
-    
-    def _process_fullpage_placeholders(self, notes: str, pages_data: List[Dict[str, Any]]) -> str:
-        """
-        处理笔记中的完整页面图像占位符，替换为实际图像引用
+            # 解析页面和图像索引，格式无效时保持原样
+            parsed_id = _parse_img_id(img_id)
+            if parsed_id is None:
+                logger.debug("无法解析图片ID: %s", img_id)
+                return None
+            
+            relative_path = image_map.get(parsed_id)
+            if relative_path is None:
+                if parsed_id in image_map:
+                    logger.error("图片信息缺少relative_path字段: %s", img_id)
+                else:
+                    logger.debug("在映射中找不到键: %s", parsed_id)
+                # 找不到图像时保持原样
+                return None
+            
+            logger.debug("使用相对路径: %s", relative_path)
+            if description:
+                return f"![{description}]({relative_path})"
+            return f"![图片 {img_id}]({relative_path})"
         
-        Args:
-            notes: 笔记内容
-            pages_data: 页面数据
+        def replace_fullpage(payload):
+            placeholder = payload.strip()
             
-        Returns:
-            str: 处理后的笔记内容
-        """
-        try:
-            # 查找并替换完整页面图像占位符标签
-            import re
+            # 解析页面标识符和描述，占位符两端已去除空白，描述只需去除开头多余的空格
+            page_id, _, description = placeholder.partition(" ")
+            description = description.lstrip()
             
-            # 定义图像占位符模式
-            # 格式为: {{{fullpage: page_x description}}}
-            pattern = r"\{\{\{fullpage:([^}]*)\}\}\}"
+            if not page_id.startswith("page"):
+                return None
             
-            def replace_fullpage(match):
-                try:
-                    placeholder = match.group(1).strip()
-                    parts = placeholder.split(" ", 1)
-                    
-                    if len(parts) == 0:
-                        return match.group(0)  # 保持原样
-                    
-                    # 解析页面标识符和描述
-                    page_id = parts[0].strip()
-                    description = parts[1].strip() if len(parts) > 1 else ""
-                    
-                    # 尝试解析页面索引
-                    try:
-                        if page_id.startswith("page"):
-                            page_str = page_id.replace("page", "")
-                            page_index = int(page_str) - 1  # 转换为0索引
-                            
-                            # 查找对应页面
-                            for page in pages_data:
-                                if page["index"] == page_index and "full_page_image" in page:
-                                    full_page = page["full_page_image"]
-                                    if isinstance(full_page, dict) and "relative_path" in full_page:
-                                        relative_path = full_page["relative_path"]
-                                        
-                                        if description:
-                                            return f"![{description}]({relative_path})"
-                                        else:
-                                            return f"![完整页面 {page_index+1}]({relative_path})"
-                    except Exception as e:
-                        print(f"处理整页图片引用时出错: {str(e)}")
-                except Exception as e:
-                    print(f"替换整页图片占位符时出错: {str(e)}")
-                
-                # 如果无法解析或找不到页面，保持原样
-                return match.group(0)
+            # 解析页面索引，格式无效时保持原样
+            try:
+                page_index = int(page_id[4:]) - 1  # 转换为0索引
+            except ValueError:
+                return None
             
-            # 替换所有完整页面图像占位符
-            processed_notes = re.sub(pattern, replace_fullpage, notes)
+            # 查找对应页面的完整页面图像，找不到时保持原样
+            relative_path = fullpage_map.get(page_index)
+            if relative_path is None:
+                return None
             
-            return processed_notes
-        except Exception as e:
-            print(f"处理整页图片占位符时出错: {str(e)}")
-            # 出错时返回原始笔记内容
+            if description:
+                return f"![{description}]({relative_path})"
+            return f"![完整页面 {page_index+1}]({relative_path})"
+        
+        # 一次扫描所有图像和完整页面图像占位符，只在成功替换处切分原文，
+        # 无法替换的占位符留在相邻的原文片段中，不单独复制
+        logger.debug("开始替换占位符")
+        output = []
+        last_end = 0
+        for match in _PLACEHOLDER_RE.finditer(notes):
+            kind, payload = match.group(1, 2)
+            # 按占位符类型分派
+            replacement = replace_image(payload) if kind == "image" else replace_fullpage(payload)
+            if replacement is None:
+                continue
+            output.append(notes[last_end:match.start()])
+            output.append(replacement)
+            last_end = match.end()
+        
+        # 没有任何占位符被替换时直接返回原文
+        if not output:
+            logger.debug("没有可替换的占位符")
             return notes
+        
+        output.append(notes[last_end:])
+        processed_notes = "".join(output)
+        logger.debug("完成占位符替换")
+        
+        return processed_notes
     
     def _check_images_valid(self, pages_data: List[Dict[str, Any]]) -> bool:
         """
@@ -1032,25 +1359,37 @@ class VLAnalyzer:
                 if full_page and isinstance(full_page, dict) and ('relative_path' in full_page or 'image' in full_page):
                     valid_full_pages_count += 1
             
-            print(f"PPT图像分析：有效图片页数 {valid_images_count}/{total_pages}")
-            print(f"PPT图像分析：有效全页图片页数 {valid_full_pages_count}/{total_pages}")
+            logger.info("PPT图像分析：有效图片页数 %s/%s", valid_images_count, total_pages)
+            logger.info("PPT图像分析：有效全页图片页数 %s/%s", valid_full_pages_count, total_pages)
             
             # 如果没有任何有效图片或图片太少，返回False
             if valid_images_count == 0 and valid_full_pages_count == 0:
-                print("PPT图像分析：未找到任何有效图片")
+                logger.warning("PPT图像分析：未找到任何有效图片")
                 return False
             
             # 如果有效图片比例太低，可能是数据问题
             if valid_images_count > 0 and valid_images_count < total_pages * 0.1:
-                print(f"PPT图像分析：有效图片比例太低 ({valid_images_count}/{total_pages})")
+                logger.warning("PPT图像分析：有效图片比例太低 (%s/%s)", valid_images_count, total_pages)
                 # 仍然返回True，因为有一些图片是有效的
                 return True
             
             return True
         except Exception as e:
-            print(f"检查PPT图片有效性时出错: {str(e)}")
+            logger.error("检查PPT图片有效性时出错: %s", e)
             return False
 
+    def _ensure_output_dir(self, output_file: str) -> None:
+        """
+        确保输出文件所在目录存在，已确认过的目录直接跳过
+        
+        Args:
+            output_file: 输出文件路径
+        """
+        output_dir = os.path.dirname(output_file)
+        if output_dir and output_dir not in self._output_dirs:
+            ensure_directory_exists(output_dir)
+            self._output_dirs.add(output_dir)
+    
     def _write_notes_to_file(self, notes: str, output_file: str) -> bool:
         """
         将笔记写入文件
@@ -1064,14 +1403,13 @@ class VLAnalyzer:
         """
         try:
             # 创建输出目录
-            os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+            self._ensure_output_dir(output_file)
             
             # 写入文件
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(notes)
-                
-            print(f"笔记已成功保存到: {output_file}")
+            write_text_atomic(output_file, notes)
+            
+            logger.info("笔记已成功保存到: %s", output_file)
             return True
         except Exception as e:
-            print(f"写入笔记文件时出错: {str(e)}")
+            logger.error("写入笔记文件时出错: %s", e)
             return False 
\ No newline at end of file